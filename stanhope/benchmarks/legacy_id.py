@@ -0,0 +1,47 @@
+"""
+Benchmark utils.legacy_id (row-wise) against utils.legacy_ids (batched).
+
+Usage:
+    python -m benchmarks.legacy_id [ROWS] [WORKERS]
+"""
+import sys
+import timeit
+
+import numpy
+import pandas
+from stanhope import utils
+
+
+def frameorders(rows):
+    """ Synthetic FrameOrders key columns. """
+    rand = numpy.random.RandomState(0)
+    days = pandas.to_timedelta(rand.randint(0, 10000, rows), unit='D')
+    return pandas.DataFrame({
+        'CustomerNo': ['CUST{:06d}'.format(x)
+                       for x in rand.randint(0, rows // 4 + 1, rows)],
+        'OrderNo': ['{:07d}'.format(x) for x in range(rows)],
+        'OrderDate': pandas.Timestamp('1990-01-01') + days})
+
+
+def main(rows=100000, workers=None):
+    frame = frameorders(rows)
+    timings = [
+        ('apply(legacy_id)',
+         lambda: frame.apply(utils.legacy_id, axis=1)),
+        ('legacy_ids',
+         lambda: utils.legacy_ids(frame)),
+        ('legacy_ids (threads)',
+         lambda: utils.legacy_ids(frame, workers=workers)),
+        ('legacy_ids (processes)',
+         lambda: utils.legacy_ids(frame, workers=workers,
+                                  executor='process'))]
+    assert frame.apply(utils.legacy_id, axis=1)\
+                .equals(utils.legacy_ids(frame))
+    print("{:,} rows".format(rows))
+    for name, func in timings:
+        secs = min(timeit.repeat(func, number=1, repeat=3))
+        print("{:<24}{:>10.3f}s".format(name, secs))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:3]])
@@ -0,0 +1,98 @@
+"""
+Startup Benchmark
+
+Times `stanhope --help` in fresh interpreters against a budget, checks that
+it does not import the scientific stack, and lists the slowest imports from
+`python -X importtime` (Python 3.7+).
+
+Usage:
+    python -m benchmarks.startup --budget 0.5
+"""
+import json
+import subprocess
+import sys
+import time
+
+import click
+
+HELP = '''
+try:
+    from stanhope.main import stanhope
+    stanhope(['--help'])
+except SystemExit:
+    pass
+'''
+HEAVY = ['IPython', 'ardec', 'numpy', 'pandas', 'pyarrow']
+
+
+def timed(repeat=5):
+    """ Fastest wall time of `stanhope --help` in a fresh interpreter. """
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', HELP],
+                              stdout=subprocess.DEVNULL)
+        times.append(time.time() - start)
+    return min(times)
+
+
+def heavy():
+    """ Heavy modules imported by `stanhope --help`. """
+    code = HELP + 'import sys, json\nprint(json.dumps({}))'.format(
+        '[x for x in {!r} if x in sys.modules]'.format(HEAVY))
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return json.loads(output.decode('utf-8').splitlines()[-1])
+
+
+def importtime(top=10):
+    """ Slowest top-level imports of `stanhope --help`.
+
+        Returns:
+            List of (package, cumulative seconds), or an empty list before
+            Python 3.7.
+    """
+    if sys.version_info < (3, 7):
+        return []
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', HELP],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return parse(proc.stderr.decode('utf-8'))[:top]
+
+
+def parse(stderr):
+    """ Parse top-level imports of `-X importtime` output, slowest first. """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, package = line[12:].split('|')
+        if cumulative.strip().isdigit() and not package.startswith('  '):
+            imports.append((package.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda x: x[1], reverse=True)
+
+
+@click.command()
+@click.option('--budget',
+              default=0.5,
+              help='Maximum seconds for stanhope --help',
+              show_default=True,
+              type=float)
+@click.option('--repeat',
+              default=5,
+              help='Runs to take the fastest of',
+              show_default=True,
+              type=int)
+def main(budget, repeat):
+    seconds = timed(repeat)
+    click.echo('stanhope --help: {:.3f}s (budget {:.3f}s)'.format(
+        seconds, budget))
+    for package, cumulative in importtime():
+        click.echo('  {:<30} {:.3f}s'.format(package, cumulative))
+    imported = heavy()
+    if imported:
+        click.echo('Imported by --help: {}'.format(', '.join(imported)))
+    if seconds > budget or imported:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
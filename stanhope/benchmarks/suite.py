@@ -0,0 +1,158 @@
+"""
+Benchmark Suite
+
+Times Table loads, the utils transforms and every StanhopeFramers stage end
+to end against synthetic tables served by the fake mdb-export in this
+directory, so no real .mdb file is needed. Results are written as JSON and
+can be checked against a baseline for regressions.
+
+Usage:
+    python -m benchmarks.suite --rows 100000 --output results.json
+    python -m benchmarks.suite --rows 100000 --baseline results.json
+"""
+import collections
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+import click
+from stanhope import profiling
+from stanhope import tables
+from stanhope import utils
+from stanhope.migrations import StanhopeFramers
+from stanhope.writer import CSVWriter
+
+from . import synthetic
+
+FRAMEORDERS = list(synthetic.FRAMEORDERS)
+# Directory of the fake mdb-export
+BIN = os.path.dirname(os.path.abspath(__file__))
+
+
+def serve(directory):
+    """ Serve synthetic tables in directory through the fake mdb-export. """
+    os.environ['STANHOPE_SYNTHETIC'] = directory
+    os.environ['PATH'] = os.pathsep.join([BIN, os.environ['PATH']])
+
+
+def timed(func, repeat=1):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def benchmarks(repeat=1):
+    """ Run benchmarks.
+
+        Returns:
+            OrderedDict of benchmark name to seconds.
+    """
+    results = collections.OrderedDict()
+    customers = tables.Customers()
+    frameorders = tables.FrameOrders(*FRAMEORDERS)
+    results['load.customers'] = timed(customers.load, repeat)
+    results['load.frameorders'] = timed(frameorders.load, repeat)
+
+    orders = frameorders.frame
+    keys = orders[['CustomerNo', 'OrderNo', 'OrderDate']]
+    transforms = [
+        ('legacy_ids', lambda: utils.legacy_ids(keys)),
+        ('legacy_records', lambda: utils.legacy_records(orders)),
+        ('lookup.framemfgs', lambda: utils.framemfgs(orders['FrameMfg'])),
+        ('lookup.sources', lambda: utils.sources(customers.frame['Source'])),
+        ('dimensions', lambda: utils.dimensions(orders['Frame Width'])),
+        ('replace_newlines', lambda: utils.replace_newlines(
+            customers.frame[['Name', 'Address', 'City', 'State', 'Zip',
+                             'Telephone']]))]
+    for name, func in transforms:
+        results['utils.{}'.format(name)] = timed(func, repeat)
+
+    profiler = profiling.Profiler(memory=False)
+    output = tempfile.TemporaryDirectory()
+    writer = CSVWriter(output.name)
+    with output, StanhopeFramers(*FRAMEORDERS, profiler=profiler,
+                                 writer=writer) as mdb:
+        mdb.load_customers()
+        mdb.load_frameorders()
+        mdb.time_filter()
+        mdb.join_records(True)
+        mdb.export_accounts()
+        mdb.export_contacts()
+        mdb.export_orders()
+        mdb.export_treatments()
+        mdb.write_csv()
+    for stage in profiler.stages:
+        results['stage.{}'.format(stage['stage'])] = stage['wall']
+    return results
+
+
+def compare(results, baseline, threshold, minimum):
+    """ Benchmarks slower than baseline by more than threshold.
+
+        Arguments:
+            results   (dict):   Benchmark name to seconds
+            baseline  (dict):   Baseline benchmark name to seconds
+            threshold (float):  Allowed ratio of result to baseline
+            minimum   (float):  Ignore differences under this many seconds
+
+        Returns:
+            OrderedDict of benchmark name to (baseline, result, ratio).
+    """
+    regressions = collections.OrderedDict()
+    for name, secs in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if secs > base * threshold and secs - base > minimum:
+            regressions[name] = (base, secs, secs / base if base else None)
+    return regressions
+
+
+@click.command()
+@click.option('--rows', default=10000, show_default=True,
+              help='Total FrameOrders rows (10k to 10M)')
+@click.option('--data', type=click.Path(file_okay=False),
+              help='Reuse or keep synthetic tables in directory')
+@click.option('--repeat', default=1, show_default=True,
+              help='Best of N runs for load and utils benchmarks')
+@click.option('--output', type=click.Path(dir_okay=False),
+              help='Write results JSON to file')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False),
+              help='Check results against baseline JSON')
+@click.option('--threshold', default=1.25, show_default=True,
+              help='Allowed slowdown ratio against baseline')
+@click.option('--minimum', default=0.05, show_default=True,
+              help='Ignore slowdowns under this many seconds')
+def main(rows, data, repeat, output, baseline, threshold, minimum):
+    """ Run the benchmark suite against synthetic tables. """
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = data or tmp
+        if not os.path.exists(os.path.join(directory, 'Customers.csv')):
+            synthetic.generate(directory, rows)
+        serve(directory)
+        results = benchmarks(repeat)
+
+    report = {'rows': rows, 'results': results}
+    if output:
+        with open(output, 'w') as stream:
+            json.dump(report, stream, indent=2)
+    print()
+    for name, secs in results.items():
+        print('{:<32}{:>10.3f}s'.format(name, secs))
+
+    if baseline:
+        with open(baseline) as stream:
+            base = json.load(stream)
+        if base.get('rows') != rows:
+            click.echo('Baseline has {} rows, results have {}'
+                       .format(base.get('rows'), rows), err=True)
+        regressions = compare(results, base['results'], threshold, minimum)
+        for name, (before, after, ratio) in regressions.items():
+            click.echo('REGRESSION {:<32}{:>10.3f}s -> {:.3f}s ({:.2f}x)'
+                       .format(name, before, after, ratio), err=True)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Synthetic StanhopeFramers Tables
+
+Generates Customers and FrameOrders-Working/Closed/Archive tables as
+mdb-export would print them, with realistic value distributions, for
+serving through the fake mdb-export in this directory.
+
+Usage:
+    python -m benchmarks.synthetic DIRECTORY [ROWS]
+"""
+import collections
+import os
+import sys
+
+import numpy
+import pandas
+
+CHUNKSIZE = 100000
+FRAMEORDERS = {'FrameOrders-Working': 0.05,
+               'FrameOrders-Closed': 0.15,
+               'FrameOrders-Archive': 0.80}
+
+TEXT = [('', 0.4), ('Plain note', 0.3), ('Two\nlines', 0.1),
+        ('Vertical\x0btab', 0.05), ('  padded  ', 0.05), ('`quoted`', 0.02),
+        (u'Caf\xe9', 0.03), ('Slash/ed', 0.03), ('CR\r\nLF', 0.02)]
+NAMES = [('Smith', 0.2), ('Jones', 0.2), ('Bob\nSmith', 0.05),
+         ('Ann\x0bLee', 0.05), ('O\'Neil', 0.1), (u'Ren\xe9e', 0.1),
+         ('  Spaced  ', 0.1), ('Gallery 7', 0.2)]
+CATEGORIES = [('Retail', 0.6), (' Retail ', 0.05), ('Artist', 0.1),
+              ('Dealer', 0.05), ('Gallery', 0.05), ('Employee', 0.02),
+              ('Other', 0.03), ('Misc', 0.02), ('', 0.08)]
+SOURCES = [('WLK IN', 0.3), ('wlk in.', 0.05), ('YP', 0.1), ('YLW PG', 0.05),
+           ('WEB', 0.15), ('COUPON', 0.05), ('WBUR', 0.05), ('Friend', 0.05),
+           ('', 0.2)]
+DIMENSIONS = [('16 3/4', 0.1), ('20', 0.25), ('8.1/2', 0.05),
+              ('11 1/4', 0.1), ('24', 0.15), ('10 1/3', 0.02),
+              ('12 5/16', 0.05), ('7/8', 0.02), ('', 0.15), ('11.25', 0.03),
+              ('9 2/4', 0.03), ('24x36', 0.02), ('30 1/8', 0.03)]
+FRAMEMFG = [('ROMA', 0.2), ('LJ', 0.15), ('NIELSEN', 0.1), ('UPF', 0.05),
+            ('STANHOPE', 0.1), ('BOSTON ART FRAM', 0.05), (u'D\xc9COR', 0.03),
+            ('OMEGA', 0.07), ('PROVIDED', 0.05), ('Acme', 0.05), ('', 0.15)]
+GLAZING = [('Reg Glass', 0.3), ('Museum Glass', 0.1), ('Cons Clear', 0.2),
+           ('NONE', 0.05), ('prov', 0.05), ('REG Plexi', 0.1),
+           ('CUSTOMER PLEXI', 0.02), ('', 0.18)]
+MAT = [('Dry Mount', 0.2), ('Float', 0.1), ('CUSTOMER', 0.05),
+       ('n/a', 0.1), ('Fabric Mat', 0.05), ('', 0.5)]
+MATMFG = [('Alpha', 0.2), ('Rising', 0.2), ('Pongee Silk', 0.05),
+          ('Crescent', 0.1), ('', 0.45)]
+SALES_TYPES = [('WPF', 0.3), ('WHF', 0.3), ('MATS', 0.1), ('CONS', 0.05),
+               ('VOID', 0.05), ('SPO', 0.05), ('OTH', 0.05), ('XX', 0.1)]
+STATUSES = [('C', 0.6), ('A', 0.2), ('O', 0.1), ('X', 0.05), ('V', 0.05)]
+DISCOUNTS = [('', 0.8), ('Artist', 0.05), ('Wbur', 0.05),
+             ('SMFA Art Sale', 0.05), ('special', 0.05)]
+
+
+def choice(rand, values, size):
+    keys, weights = zip(*values)
+    weights = numpy.array(weights) / sum(weights)
+    # mdb-export prints NULLs as empty, unquoted fields
+    keys = [x or None for x in keys]
+    return numpy.array(keys, dtype=object)[
+        rand.choice(len(keys), size=size, p=weights)]
+
+
+def dates(rand, size, start='1990-01-01', days=10000, nulls=0.05):
+    offsets = pandas.to_timedelta(rand.randint(0, days, size), unit='D')
+    values = (pandas.Timestamp(start) + offsets)\
+        .strftime('%m/%d/%y %H:%M:%S').values.astype(object)
+    values[rand.rand(size) < nulls] = None
+    return values
+
+
+def flags(rand, size, true=0.1):
+    return numpy.where(rand.rand(size) < true, 1, 0)
+
+
+def customers(rand, start, size):
+    numbers = numpy.arange(start, start + size)
+    return pandas.DataFrame(collections.OrderedDict([
+        ('Customer Number', ['c{:06d} '.format(x) for x in numbers]),
+        ('Name', choice(rand, NAMES, size)),
+        ('Address', choice(rand, TEXT, size)),
+        ('City', choice(rand, [('Boston', 0.6), ('Somerville', 0.3),
+                               ('', 0.1)], size)),
+        ('State', choice(rand, [('MA', 0.9), (' ma', 0.05), ('', 0.05)],
+                         size)),
+        ('Zip', choice(rand, [('02139', 0.5), ('02143', 0.4), ('', 0.1)],
+                       size)),
+        ('Telephone', choice(rand, [('617-555-0100', 0.8), ('', 0.2)], size)),
+        ('Email', choice(rand, [('a@example.com', 0.3), ('', 0.7)], size)),
+        ('Date', dates(rand, size)),
+        ('Last Order', dates(rand, size, nulls=0.2)),
+        ('Last Update', dates(rand, size, nulls=0.2)),
+        ('Deceased', flags(rand, size, 0.01)),
+        ('Credit', flags(rand, size)),
+        ('Tax Exempt', flags(rand, size)),
+        ('Category', choice(rand, CATEGORIES, size)),
+        ('Source', choice(rand, SOURCES, size)),
+        ('Comment', choice(rand, TEXT, size))]))
+
+
+def frameorders(rand, table, start, size, customers):
+    numbers = numpy.arange(start, start + size)
+    # A few orders reference customers that do not exist
+    custno = rand.randint(0, int(customers * 1.02) + 1, size)
+    return pandas.DataFrame(collections.OrderedDict([
+        ('CustomerNo', ['c{:06d}'.format(x) for x in custno]),
+        ('OrderNo', ['{}{:07d}'.format(table[12].lower(), x)
+                     for x in numbers]),
+        ('OrderDate', dates(rand, size, nulls=0.001)),
+        ('DueDate', dates(rand, size, nulls=0.1)),
+        ('DateCompleted', dates(rand, size, nulls=0.3)),
+        ('Status', choice(rand, STATUSES, size)),
+        ('Location', choice(rand, [('BOS', 0.6), ('SOM', 0.35), ('', 0.05)],
+                            size)),
+        ('SalesPers', choice(rand, [('RS', 0.5), ('SN', 0.2), ('AB', 0.2),
+                                    ('', 0.1)], size)),
+        ('Delivery', choice(rand, [('PU BOS', 0.7), ('UPS', 0.1), ('', 0.2)],
+                            size)),
+        ('Cust-Client', choice(rand, NAMES + [('', 2.0)], size)),
+        ('Discount', choice(rand, DISCOUNTS, size)),
+        ('Artist', choice(rand, NAMES + [('', 4.0)], size)),
+        ('BinNo', choice(rand, [('A1', 0.3), ('B2', 0.3), ('', 0.4)], size)),
+        ('Comments', choice(rand, TEXT, size)),
+        ('Fitting', choice(rand, [('Y', 0.5), ('', 0.5)], size)),
+        ('Frame Height', choice(rand, DIMENSIONS, size)),
+        ('Frame Width', choice(rand, DIMENSIONS, size)),
+        ('FrameMfg', choice(rand, FRAMEMFG, size)),
+        ('FrameNo', rand.randint(100, 99999, size).astype(str)),
+        ('Glazing', choice(rand, GLAZING, size)),
+        ('Joining', choice(rand, [('Nailed', 0.5), ('Splined', 0.3),
+                                  ('', 0.2)], size)),
+        ('Mat', choice(rand, MAT, size)),
+        ('MatColor', choice(rand, [('White', 0.5), ('Cream', 0.2),
+                                   ('', 0.3)], size)),
+        ('MatMfg', choice(rand, MATMFG, size)),
+        ('Matting', choice(rand, [('Y', 0.4), ('', 0.6)], size)),
+        ('MattingSize', choice(rand, [('2"', 0.4), ('3"', 0.2), ('', 0.4)],
+                               size)),
+        ('ProductionComments', choice(rand, TEXT, size)),
+        ('Qty', rand.randint(1, 5, size)),
+        ('SalesCatgy', choice(rand, [('F', 0.7), ('M', 0.2), ('', 0.1)],
+                              size)),
+        ('SalesType', choice(rand, SALES_TYPES, size)),
+        ('TotalSale', numpy.round(rand.gamma(2, 150, size), 2))]))
+
+
+def write(frames, path):
+    """ Write frames to path formatted like mdb-export output. """
+    with open(path, 'w') as stream:
+        for idx, frame in enumerate(frames):
+            if idx == 0:
+                stream.write(','.join(_quote(x) for x in frame.columns))
+                stream.write('\n')
+            stream.write(_format(frame))
+
+
+def _quote(value):
+    return '"{}"'.format(value.replace('"', '""'))
+
+
+def _format(frame):
+    """ Render frame as CSV lines with quoted strings and empty NULLs. """
+    cols = []
+    for name, col in frame.items():
+        if col.dtype == object:
+            text = '"' + col.str.replace('"', '""') + '"'
+        else:
+            text = col.astype(str)
+        cols.append(text.where(col.notnull(), ''))
+    lines = cols[0].str.cat(cols[1:], sep=',')
+    return ''.join(x + '\n' for x in lines)
+
+
+def generate(directory, rows, seed=0, chunksize=CHUNKSIZE):
+    """ Generate synthetic tables.
+
+        Arguments:
+            directory (str):  Directory to write <Table>.csv files into
+            rows      (int):  Total FrameOrders rows across all tables
+            seed      (int):  Random seed
+            chunksize (int):  Rows generated at a time
+
+        Returns:
+            dict of table name to row count.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rand = numpy.random.RandomState(seed)
+    counts = {'Customers': max(rows // 4, 1)}
+    for table, share in FRAMEORDERS.items():
+        counts[table] = max(int(rows * share), 1)
+
+    ncust = counts['Customers']
+    write((customers(rand, start, size)
+           for start, size in _chunks(ncust, chunksize)),
+          os.path.join(directory, 'Customers.csv'))
+    for table in FRAMEORDERS:
+        write((frameorders(rand, table, start, size, ncust)
+               for start, size in _chunks(counts[table], chunksize)),
+              os.path.join(directory, '{}.csv'.format(table)))
+    return counts
+
+
+def _chunks(count, chunksize):
+    for start in range(0, count, chunksize):
+        yield start, min(chunksize, count - start)
+
+
+if __name__ == '__main__':
+    print(generate(sys.argv[1], int(sys.argv[2]) if sys.argv[2:] else 10000))
@@ -0,0 +1,100 @@
+"""
+Batch Migrations
+
+Migrates several .mdb files at once, each through a complete
+StanhopeFramers pipeline in a pool of worker processes, into an output
+directory per file. Workers are reused across files, so imports are paid
+once per worker rather than once per file.
+"""
+import collections
+import concurrent.futures
+import contextlib
+import glob
+import os
+import time
+
+import pandas
+
+LOG = 'stanhope.log'
+
+
+def paths(patterns):
+    """ .mdb paths matching patterns, in order, without duplicates. """
+    matched = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if path not in matched:
+                matched.append(path)
+    return matched
+
+
+def directories(output_dir, paths):
+    """ Output directory of each path, named after the file.
+
+        Files with the same name get numbered directories.
+    """
+    names = [os.path.splitext(os.path.basename(x))[0] for x in paths]
+    counts = collections.Counter(names)
+    seen = collections.Counter()
+    dirs = []
+    for name in names:
+        seen[name] += 1
+        if counts[name] > 1:
+            name = '{}-{}'.format(name, seen[name])
+        dirs.append(os.path.join(output_dir, name))
+    return dirs
+
+
+def run(paths, output_dir, params, processes=None):
+    """ Migrate .mdb files in parallel.
+
+        Arguments:
+            paths      (list):  .mdb paths
+            output_dir (str):   Directory of the per-file output directories
+            params     (dict):  stanhope command parameters
+            processes  (int):   Number of worker processes (optional)
+
+        Returns:
+            DataFrame of row counts, seconds and errors by .mdb path.
+    """
+    jobs = []
+    for path, directory in zip(paths, directories(output_dir, paths)):
+        job = dict(params)
+        # Each file keeps its own manifest and profiles
+        for key in ['since_manifest', 'cprofile']:
+            if job.get(key):
+                job[key] = os.path.join(directory,
+                                        os.path.basename(job[key]))
+        jobs.append((path, directory, job))
+    processes = processes or min(len(jobs), os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        rows = list(pool.map(_migrate, jobs))
+    # Object columns keep counts of failed files from upcasting to floats
+    return pandas.DataFrame(rows, index=pandas.Index(paths, name='mdb'),
+                            columns=list(rows[0]), dtype=object)
+
+
+def _migrate(job):
+    """ Migrate one .mdb file in a worker, logging to its directory. """
+    from .main import migrate
+    path, directory, params = job
+    params = dict(params, output_dir=directory)
+    os.makedirs(directory, exist_ok=True)
+    start = time.time()
+    row = collections.OrderedDict([('Accounts', None),
+                                   ('Contacts', None),
+                                   ('Orders', None),
+                                   ('Treatments', None),
+                                   ('Seconds', None),
+                                   ('Error', None)])
+    with open(os.path.join(directory, LOG), 'w') as log, \
+            contextlib.redirect_stdout(log):
+        try:
+            mdb = migrate(path, **params)
+        except Exception as err:
+            row['Error'] = '{}: {}'.format(type(err).__name__, err)
+        else:
+            for name, frame in mdb.outputs.items():
+                row[name] = len(frame)
+    row['Seconds'] = round(time.time() - start, 3)
+    return row
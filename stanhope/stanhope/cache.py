@@ -0,0 +1,132 @@
+"""
+mdb-export Cache
+
+On-disk cache of table exports keyed by the .mdb file's size, mtime and a
+fast content hash together with the table name, capped in size with
+least-recently-used eviction.
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from stanhope import utils
+
+DIRECTORY = '/data/.stanhope-cache'
+MAXSIZE = 2 ** 31
+
+
+class ExportCache(object):
+    def __init__(self, directory=DIRECTORY, maxsize=MAXSIZE, path=utils.MDB):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.path = path
+
+    def key(self, table):
+        """ Cache key of table export. """
+        payload = json.dumps(utils.fingerprint(self.path) + [table])\
+            .encode('utf-8')
+        return hashlib.sha1(payload).hexdigest()
+
+    def filename(self, table):
+        return os.path.join(self.directory, '{}.csv'.format(self.key(table)))
+
+    @contextlib.contextmanager
+    def export(self, table):
+        """ Stream table export from the cache, or from mdb-export.
+
+            On a miss the export is written through to the cache as it is
+            read, and only committed once mdb-export completes.
+
+            Arguments:
+                table (str):  Name of table to export
+
+            Yields:
+                Binary file-like object of CSV output.
+        """
+        filename = self.filename(table)
+        try:
+            stream = open(filename, 'rb')
+        except FileNotFoundError:
+            stream = None
+        if stream is not None:
+            with stream:
+                # Through the open file, as the entry may be evicted now
+                os.utime(stream.fileno())
+                yield stream
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix='.tmp', delete=False)
+        try:
+            with tmp, utils.mdb_export(table, self.path) as pipe:
+                tee = io.BufferedReader(_Tee(pipe, tmp))
+                yield tee
+                while tee.read(utils.BLOCKSIZE):
+                    pass
+            os.replace(tmp.name, filename)
+            self.evict()
+        finally:
+            if os.path.exists(tmp.name):
+                os.remove(tmp.name)
+
+    def entries(self):
+        """ Cached exports, least recently used first.
+
+            Exports evicted meanwhile by other processes are left out.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        paths = [os.path.join(self.directory, x)
+                 for x in os.listdir(self.directory) if x.endswith('.csv')]
+        stats = []
+        for path in paths:
+            try:
+                stats.append((os.stat(path), path))
+            except FileNotFoundError:
+                pass
+        return [(stat.st_size, path) for stat, path in
+                sorted(stats, key=lambda x: x[0].st_mtime_ns)]
+
+    def evict(self):
+        """ Remove least recently used exports until under maxsize. """
+        entries = self.entries()
+        total = sum(size for size, _ in entries)
+        for size, path in entries:
+            if total <= self.maxsize:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        """ Remove all cached exports. """
+        for _, path in self.entries():
+            _remove(path)
+
+
+def _remove(path):
+    """ Remove path, unless another process already has. """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _Tee(io.RawIOBase):
+    """ Readable stream copying everything read from source into sink. """
+    def __init__(self, source, sink):
+        super(_Tee, self).__init__()
+        self.source = source
+        self.sink = sink
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        self.sink.write(data)
+        buffer[:len(data)] = data
+        return len(data)
@@ -0,0 +1,276 @@
+"""
+KnackHQ Uploader
+
+Creates records from migrated CSVs through the Knack REST API, over pooled
+keep-alive connections with bounded concurrency and rate-limit backoff.
+Progress is checkpointed to a file so an interrupted upload resumes where
+it stopped.
+"""
+import collections
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+import pandas
+
+URL = 'https://api.knack.com/v1'
+RETRY = [429, 500, 502, 503, 504]
+# Methods safe to repeat after the server may have acted on them
+IDEMPOTENT = ['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT']
+
+
+class KnackError(Exception):
+    def __init__(self, status, body):
+        super(KnackError, self).__init__('{}: {}'.format(status, body))
+        self.status = status
+        self.body = body
+
+
+class Knack(object):
+    def __init__(self, app_id, api_key, url=URL, retries=5, backoff=1.0,
+                 timeout=60):
+        parts = urllib.parse.urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection \
+            if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.headers = {'Content-Type': 'application/json',
+                        'X-Knack-Application-Id': app_id,
+                        'X-Knack-REST-API-Key': api_key}
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.pool = queue.LifoQueue()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """ Borrow a keep-alive connection from the pool.
+
+            Connections that raise are closed instead of returned.
+        """
+        try:
+            conn = self.pool.get_nowait()
+        except queue.Empty:
+            conn = self.connection_class(self.host, timeout=self.timeout)
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+        self.pool.put(conn)
+
+    def close(self):
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+
+    def delay(self, attempt, retry_after=None):
+        """ Seconds to wait before retrying, honoring Retry-After. """
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return self.backoff * 2 ** attempt
+
+    def request(self, method, path, body=None):
+        """ Send a request, retrying rate-limited and failed ones.
+
+            Requests that are not idempotent, such as record-creating POSTs,
+            are retried only when rate-limited or when the connection failed
+            before they were sent, since a server error or timeout may
+            follow a committed record.
+
+            Arguments:
+                method (str):   HTTP method
+                path   (str):   Path relative to the API URL
+                body   (dict):  JSON body (optional)
+
+            Returns:
+                Decoded JSON response.
+        """
+        payload = None if body is None else json.dumps(body).encode('utf-8')
+        idempotent = method in IDEMPOTENT
+        retry = RETRY if idempotent else [429]
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            sent = False
+            try:
+                with self.connection() as conn:
+                    if conn.sock is None:
+                        conn.connect()
+                    sent = True
+                    conn.request(method, self.prefix + path, payload,
+                                 self.headers)
+                    response = conn.getresponse()
+                    data = response.read()
+            except (http.client.HTTPException, OSError):
+                if attempt == self.retries or (sent and not idempotent):
+                    raise
+            else:
+                if response.status < 400:
+                    return json.loads(data.decode('utf-8')) if data else {}
+                if response.status not in retry or attempt == self.retries:
+                    raise KnackError(response.status, data.decode('utf-8'))
+                retry_after = response.getheader('Retry-After')
+            time.sleep(self.delay(attempt, retry_after))
+
+    def fields(self, key):
+        """ Field keys of object key by field label. """
+        fields = self.request('GET', '/objects/{}/fields'.format(key))
+        return {x['label']: x['key'] for x in fields['fields']}
+
+    def create(self, key, record):
+        return self.request('POST', '/objects/{}/records'.format(key), record)
+
+
+class Checkpoint(object):
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.saved = 0
+        try:
+            with open(path) as stream:
+                self.state = json.load(stream)
+        except (IOError, ValueError):
+            self.state = {}
+
+    def start(self, name, source, batch_size):
+        """ Rows already uploaded of each batch of name.
+
+            Progress is discarded if the source files or batch size changed.
+        """
+        with self.lock:
+            state = self.state.get(name)
+            if state is None or state['source'] != source \
+                    or state['batch_size'] != batch_size:
+                state = self.state[name] = {
+                    'source': source, 'batch_size': batch_size, 'done': {}}
+            return {int(k): v for k, v in state['done'].items()}
+
+    def update(self, name, batch, rows, save=False):
+        """ Record rows uploaded of batch, saving at most every interval. """
+        with self.lock:
+            self.state[name]['done'][str(batch)] = rows
+            if save or time.time() - self.saved >= self.interval:
+                self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as stream:
+            json.dump(self.state, stream)
+        os.replace(self.path + '.tmp', self.path)
+        self.saved = time.time()
+
+
+class Uploader(object):
+    def __init__(self, knack, checkpoint, batch_size=100, workers=8):
+        self.knack = knack
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stopped = threading.Event()
+
+    def upload(self, name, key, paths):
+        """ Create a record for each row of the CSVs of an output.
+
+            Arguments:
+                name  (str):   Output name, eg. 'Accounts'
+                key   (str):   Knack object key, eg. 'object_1'
+                paths (list):  CSV files of the output
+
+            Returns:
+                OrderedDict of upload statistics.
+        """
+        start = time.time()
+        frame = read(paths)
+        fields = self.knack.fields(key)
+        unmapped = [x for x in frame.columns if x not in fields]
+        frame = frame.drop(unmapped, axis=1).rename(columns=fields)
+        source = [digest(x) for x in paths]
+        done = self.checkpoint.start(name, source, self.batch_size)
+        jobs = []
+        for batch, begin in enumerate(range(0, len(frame), self.batch_size)):
+            offset = done.get(batch, 0)
+            stop = min(begin + self.batch_size, len(frame))
+            if begin + offset < stop:
+                jobs.append((batch, offset, frame.iloc[begin:stop]))
+
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as pool:
+            futures = [pool.submit(self.batch, name, key, *x) for x in jobs]
+            try:
+                uploaded = sum(x.result() for x in futures)
+            except BaseException:
+                self.stopped.set()
+                raise
+            finally:
+                concurrent.futures.wait(futures)
+                self.checkpoint.save()
+
+        seconds = time.time() - start
+        return collections.OrderedDict([
+            ('Records', uploaded),
+            ('Skipped', len(frame) - uploaded),
+            ('Seconds', seconds),
+            ('Records/s', uploaded / seconds if seconds else 0.0),
+            ('Unmapped', ', '.join(unmapped))])
+
+    def batch(self, name, key, batch, offset, frame):
+        """ Upload rows of a batch from offset, checkpointing progress. """
+        rows = offset
+        try:
+            for record in records(frame.iloc[offset:]):
+                if self.stopped.is_set():
+                    break
+                self.knack.create(key, record)
+                rows += 1
+                self.checkpoint.update(name, batch, rows)
+        except BaseException:
+            # Stop the other batches too
+            self.stopped.set()
+            raise
+        finally:
+            self.checkpoint.update(name, batch, rows, save=True)
+        return rows - offset
+
+
+def paths(directory, name):
+    """ CSV files written for an output: its shards, or else the whole file.
+
+        A whole file left beside shards is stale, so is not uploaded.
+    """
+    shards = glob.glob(os.path.join(directory, '{}-[0-9][0-9][0-9].csv*'
+                                    .format(name)))
+    whole = glob.glob(os.path.join(directory, '{}.csv*'.format(name)))
+    return sorted(shards or whole)
+
+
+def read(paths):
+    """ Read CSVs as the strings written, with empty cells as ''. """
+    frames = [pandas.read_csv(x, dtype=str, keep_default_na=False)
+              for x in paths]
+    return pandas.concat(frames, ignore_index=True)
+
+
+def digest(path, blocksize=2 ** 20):
+    """ SHA1 of file contents, identifying the rows checkpointed. """
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as stream:
+        for block in iter(lambda: stream.read(blocksize), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def records(frame):
+    """ Knack record bodies of rows, omitting empty fields. """
+    columns = list(frame.columns)
+    for row in frame.itertuples(index=False):
+        yield {k: v for k, v in zip(columns, row) if v != ''}
@@ -0,0 +1,78 @@
+"""
+Legacy Record Store
+
+Writes the Legacy Records of outputs apart from their CSVs, as gzipped JSON
+lines of Legacy ID and Legacy Record, one line per distinct pair. The CSVs
+keep only the Legacy ID to look records up by.
+"""
+import collections
+import gzip
+import os
+
+import numpy
+import pandas
+
+COLUMNS = ['Legacy ID', 'Legacy Record']
+
+
+class LegacyStore(object):
+    def __init__(self, directory='/data'):
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(self.directory, '{}-Legacy.jsonl.gz'.format(name))
+
+    def split(self, outputs):
+        """ Move the Legacy Records of outputs into stores.
+
+            Arguments:
+                outputs (dict):  Output name to DataFrame, or to an iterable
+                                 of DataFrames of consecutive rows
+
+            Returns:
+                Outputs without Legacy Records. Records of iterables are
+                stored as the returned iterables are consumed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        split = collections.OrderedDict()
+        for name, frames in outputs.items():
+            if isinstance(frames, pandas.DataFrame):
+                frames, = self.store(name, [frames])
+            else:
+                frames = self.store(name, frames)
+            split[name] = frames
+        return split
+
+    def store(self, name, frames):
+        """ Store the Legacy Records of frames, yielding them without.
+
+            Arguments:
+                name   (str):       Output name
+                frames (iterable):  DataFrames of consecutive rows
+
+            Yields:
+                Each frame without its Legacy Record column.
+        """
+        seen = numpy.array([], dtype='uint64')
+        stream = None
+        try:
+            for frame in frames:
+                if 'Legacy Record' not in frame:
+                    yield frame
+                    continue
+                if stream is None:
+                    stream = gzip.open(self.path(name), 'wt', encoding='utf-8')
+                records = frame[COLUMNS]
+                hashes = pandas.util.hash_pandas_object(
+                    records, index=False).values
+                new = ~pandas.Series(hashes).duplicated().values \
+                    & ~numpy.in1d(hashes, seen)
+                seen = numpy.union1d(seen, hashes[new])
+                text = records[new].to_json(orient='records', lines=True)
+                if text and not text.endswith('\n'):
+                    text += '\n'
+                stream.write(text)
+                yield frame.drop('Legacy Record', axis=1)
+        finally:
+            if stream is not None:
+                stream.close()
@@ -1,30 +1,183 @@
-""" Stanhope Framers Data Migration """
-import IPython
+""" Stanhope Framers Data Migration
+
+Only click is imported up front so --help stays fast; pandas and friends
+are imported by the command that needs them.
+"""
+import os
+
 import click
 from . import options
-from .migrations import StanhopeFramers
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @options.ARCHIVED
+@options.CACHE_DIR
+@options.CACHE_SIZE
+@options.CHUNKSIZE
+@options.CLEAR_CACHE
 @options.CLOSED
+@options.COMPRESSION
+@options.CPROFILE
+@options.DELETED
 @options.EPOCH
 @options.INTERACTIVE
+@options.JOBS
 @options.JOIN
+@options.LEGACY_RECORDS
+@options.MANIFEST
+@options.MAX_MEMORY
+@options.MDB
+@options.NO_CACHE
 @options.OPENED
-def stanhope(archived, closed, epoch, interactive, join, opened):
+@options.OUTPUT_DIR
+@options.PIPELINES
+@options.PROFILE
+@options.SHARD_ROWS
+@options.SHARD_SIZE
+@options.SNAPSHOT_DIR
+@options.TAG
+@options.WATCH
+@options.WATCH_INTERVAL
+@options.WORKERS
+@options.WRITERS
+@click.pass_context
+def stanhope(ctx, archived, cache_dir, cache_size, chunksize, clear_cache,
+             closed, compression, cprofile, deleted, epoch, interactive, jobs,
+             join, legacy_records, since_manifest, max_memory, mdbs, no_cache,
+             opened, output_dir, pipelines, profile, shard_rows, shard_size,
+             snapshot_dir, tag, watch, watch_interval, workers, writers):
     """ Stanhope Framers Data Migration """
-    with StanhopeFramers(opened, closed, archived) as mdb:
-        customers = mdb.load_customers()
-        frameorders = mdb.load_frameorders()
-        mdb.time_filter(epoch)
-        mdb.join_records(join)
-        accounts = mdb.export_accounts()
-        contacts = mdb.export_contacts()
-        orders = mdb.export_orders()
-        treatments = mdb.export_treatments()
-        mdb.report()
-        mdb.write_csv()
+    if ctx.invoked_subcommand is not None:
+        return
+    if watch and since_manifest:
+        raise click.UsageError('--watch cannot be used with --since-manifest')
+    if max_memory and (watch or since_manifest):
+        raise click.UsageError(
+            '--max-memory cannot be used with --watch or --since-manifest')
+    from . import utils
+    from .cache import ExportCache
+    utils.configure()
+    if clear_cache:
+        ExportCache(cache_dir).clear()
+    paths = batch_paths(mdbs)
+    if len(paths) > 1:
+        if watch or interactive:
+            raise click.UsageError(
+                '--watch and --interactive migrate a single .mdb file')
+        from . import batch
+        report = batch.run(paths, output_dir, ctx.params, pipelines)
+        click.echo('\n{}\n'.format(report.to_string()))
+        report.to_csv(os.path.join(output_dir, 'batch.csv'))
+        if report['Error'].notnull().any():
+            ctx.exit(1)
+        return
+
+    mdb = migrate(paths[0], **ctx.params)
+    customers = mdb.customers.frame
+    frameorders = mdb.frameorders.frame
+    accounts, contacts, orders, treatments = mdb.outputs.values()
 
     if interactive is True:
+        import IPython
         IPython.embed()
+
+    if watch:
+        try:
+            mdb.watch(epoch, join, watch_interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def batch_paths(patterns):
+    """ .mdb paths of the --mdb patterns, or the default .mdb file. """
+    from . import batch
+    from . import utils
+    return batch.paths(patterns) or [utils.MDB]
+
+
+def migrate(path, archived, cache_dir, cache_size, chunksize, closed,
+            compression, cprofile, deleted, epoch, jobs, join, legacy_records,
+            since_manifest, max_memory, no_cache, opened, output_dir, profile,
+            shard_rows, shard_size, snapshot_dir, tag, watch, workers, writers,
+            **_):
+    """ Run a complete migration of one .mdb file.
+
+        Takes the parameters of the stanhope command.
+
+        Returns:
+            StanhopeFramers migration, after it ran.
+    """
+    from . import utils
+    from .cache import ExportCache
+    from .legacy import LegacyStore
+    from .migrations import StanhopeFramers
+    from .profiling import Profiler
+    from .snapshot import Snapshots
+    from .writer import CSVWriter
+    utils.configure()
+    cache = None if no_cache else \
+        ExportCache(cache_dir, cache_size * 2 ** 20, path)
+    snapshots = Snapshots(snapshot_dir, path) if snapshot_dir else None
+    profiler = Profiler(cprofile) if profile or cprofile else None
+    max_bytes = int(shard_size * 2 ** 20) if shard_size else None
+    max_memory = int(max_memory * 2 ** 20) if max_memory else None
+    writer = CSVWriter(output_dir, shard_rows, max_bytes, compression, writers)
+    legacy = LegacyStore(output_dir) if legacy_records == 'jsonl' else None
+    with StanhopeFramers(opened, closed, archived, chunksize, tag,
+                         cache, snapshots, profiler, writer, workers,
+                         epoch, max_memory, legacy, path) as mdb:
+        if watch:
+            # Keep loaded source pages for refreshes
+            mdb.customers.pages = {}
+            mdb.frameorders.pages = {}
+        # Stage metrics are only meaningful one stage at a time
+        jobs = 1 if profiler is not None else jobs
+        mdb.schedule(epoch, join, since_manifest, deleted, jobs).run()
+
+    if profiler is not None:
+        profiler.stop()
+        profiler.dump(os.path.join(output_dir, 'profile.json'))
+        profiler.report()
+    return mdb
+
+
+@stanhope.command()
+@options.API_KEY
+@options.APP_ID
+@options.BATCH_SIZE
+@options.CHECKPOINT
+@options.CONNECTIONS
+@options.KNACK_URL
+@options.OBJECTS
+@options.OUTPUT_DIR
+@options.RESTART
+def upload(api_key, app_id, batch_size, checkpoint, connections, knack_url,
+           objects, output_dir, restart):
+    """ Upload migrated CSVs to KnackHQ """
+    from .knack import Checkpoint
+    from .knack import Knack
+    from .knack import Uploader
+    from .knack import paths
+    objects = [x.split('=', 1) for x in objects]
+    if not all(len(x) == 2 for x in objects):
+        raise click.BadParameter('expected NAME=KEY', param_hint='--object')
+    checkpoint = checkpoint or os.path.join(output_dir, '.upload.json')
+    if restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    knack = Knack(app_id, api_key, knack_url)
+    uploader = Uploader(knack, Checkpoint(checkpoint), batch_size, connections)
+    try:
+        for name, key in objects:
+            files = paths(output_dir, name)
+            if not files:
+                raise click.ClickException(
+                    'No CSVs of {} in {}'.format(name, output_dir))
+            stats = uploader.upload(name, key, files)
+            click.echo('{}: {:,} records in {:.1f}s ({:,.1f} records/s)'
+                       .format(name, stats['Records'], stats['Seconds'],
+                               stats['Records/s']))
+            if stats['Unmapped']:
+                click.echo('{}: unmapped columns {}'.format(
+                    name, stats['Unmapped']))
+    finally:
+        knack.close()
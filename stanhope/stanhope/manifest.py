@@ -0,0 +1,68 @@
+"""
+Legacy ID Manifests
+
+Compact index of Legacy ID -> content hash for each output, used to emit
+only new and changed rows on incremental migrations.
+"""
+import hashlib
+import json
+import os
+
+from stanhope import utils
+
+
+def index(frame):
+    """ Index frame contents by Legacy ID.
+
+        Rows sharing a Legacy ID are hashed together, in order.
+
+        Arguments:
+            frame (DataFrame):  Output frame with a 'Legacy ID' column
+
+        Returns:
+            dict of Legacy ID to content hash.
+    """
+    hashes = utils.legacy_ids(frame)
+    ids = frame['Legacy ID']
+    dups = ids.duplicated(keep=False)
+    result = dict(zip(ids[~dups], hashes[~dups]))
+    for legacy_id, group in hashes[dups].groupby(ids[dups], sort=False):
+        payload = ''.join(group).encode('utf-8')
+        result[legacy_id] = hashlib.sha1(payload).hexdigest()
+    return result
+
+
+def delta(frame, current, previous):
+    """ Select new and changed rows of frame.
+
+        Arguments:
+            frame    (DataFrame):  Output frame with a 'Legacy ID' column
+            current  (dict):       Index of frame
+            previous (dict):       Index of the previous run
+
+        Returns:
+            Frame of rows whose Legacy ID is new or whose content changed.
+    """
+    changed = set(k for k, v in current.items() if previous.get(k) != v)
+    return frame.loc[frame['Legacy ID'].isin(changed)]
+
+
+def deleted(current, previous):
+    """ Sorted Legacy IDs of the previous run missing from this one. """
+    return sorted(set(previous) - set(current))
+
+
+def load(path):
+    """ Load manifest from path; a missing manifest is empty. """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as stream:
+        return json.load(stream)
+
+
+def dump(manifest, path):
+    """ Write manifest to path atomically. """
+    tmp = '{}.tmp'.format(path)
+    with open(tmp, 'w') as stream:
+        json.dump(manifest, stream, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp, path)
@@ -1,83 +1,259 @@
 """ Stanhope Framers Migrations. """
 import collections
+import subprocess
+import tempfile
+import time
 
 import ardec
+import numpy
 import pandas
+from . import manifest
+from . import utils
+from . import profiling
 from .tables import Customers
 from .tables import FrameOrders
+from .scheduler import Scheduler
+from .spill import Spill
+from .spill import WORKING
+from .tables import concat
+from .tables import select
+from .writer import CSVWriter
+
+SAMPLES = 5
+
+
+def written(migration, names=None):
+    """ Attributes of the outputs written by write_csv. """
+    return [x.lower() for x in names or migration.outputs]
 
 
 class StanhopeFramers(ardec.migration):
-    def __init__(self, opened, closed, archived):
+    def __init__(self, opened, closed, archived, chunksize=None, tag=False,
+                 cache=None, snapshots=None, profiler=None, writer=None,
+                 workers=None, epoch=None, max_memory=None, legacy=None,
+                 path=utils.MDB):
         super(StanhopeFramers, self).__init__()
         tables = [x for x in [opened, closed, archived] if x]
-        self.customers = Customers()
-        self.frameorders = FrameOrders(*tables)
+        filters = [('OrderDate', '>=', epoch)] if epoch else None
+        self.customers = Customers(chunksize=chunksize, cache=cache,
+                                   path=path)
+        self.frameorders = FrameOrders(
+            *tables, chunksize=chunksize, tag=tag, cache=cache,
+            workers=workers, filters=filters, path=path)
+        self.path = path
+        self.epoch = epoch
+        self.max_memory = max_memory
+        self.partitions = None
+        self.spills = None
         self.accounts = None
         self.contacts = None
         self.orders = None
         self.treatments = None
+        self.manifest = None
+        self.deleted = None
+        self.orphans = None
+        self.snapshots = snapshots
+        self.profiler = profiler
+        self.writer = writer or CSVWriter()
+        self.legacy = legacy
+
+    def __exit__(self, *exc):
+        if self.spills is not None:
+            self.spills.cleanup()
+            self.spills = None
+        return super(StanhopeFramers, self).__exit__(*exc)
+
+    @property
+    def outputs(self):
+        return collections.OrderedDict([
+            ('Accounts', self.accounts),
+            ('Contacts', self.contacts),
+            ('Orders', self.orders),
+            ('Treatments', self.treatments)])
 
-    @ardec.stage('load_customers')
-    def load_customers(self):
-        return self.customers.load()
+    def load(self, table, tables=None):
+        """ Load table, from its snapshot when one is valid.
 
-    @ardec.stage('load_frameorders')
-    def load_frameorders(self):
-        return self.frameorders.load()
+            Arguments:
+                table  (Table):  Table to load
+                tables (list):   Source tables to reload, reusing the kept
+                                 pages of the others (optional)
+        """
+        if self.snapshots is not None and tables is None:
+            frame = self.snapshots.load(table)
+            if frame is not None:
+                table.frame = frame
+                return frame
+        frame = table.load(tables)
+        if self.snapshots is not None:
+            self.snapshots.save(table)
+        return frame
 
-    @ardec.stage('time_filter')
+    @profiling.stage('load_customers', outputs=['customers'])
+    def load_customers(self, tables=None):
+        return self.load(self.customers, tables)
+
+    @profiling.stage('load_frameorders', outputs=['frameorders'])
+    def load_frameorders(self, tables=None):
+        return self.load(self.frameorders, tables)
+
+    @profiling.stage('time_filter',
+                     inputs=['frameorders'],
+                     outputs=['frameorders'])
     def time_filter(self, epoch=None):
         if epoch:
-            frameorders = self.frameorders.frame.copy().set_index('OrderDate')
-            frameorders = frameorders[epoch:]
-            self.frameorders.frame = frameorders.reset_index()
+            self.frameorders.frame = self.since(self.frameorders.frame, epoch)
 
-    @ardec.stage('join_records')
+    def since(self, frame, epoch):
+        """ FrameOrders since epoch, with OrderDate leading. """
+        if epoch != self.epoch:
+            # Not pushed down into load
+            frame = select(frame, [('OrderDate', '>=', epoch)])
+        # OrderDate leads, as it did when filtered through set_index()
+        columns = ['OrderDate'] + \
+            [x for x in frame.columns if x != 'OrderDate']
+        return frame[columns].reset_index(drop=True)
+
+    @profiling.stage('join_records',
+                     inputs=['customers', 'frameorders'],
+                     outputs=['customers', 'frameorders'])
     def join_records(self, join=False):
-        frame_cust = self.frameorders.frame['CustomerNo']
-        all_cust = self.customers.frame['Customer Number']
-        cust = set(frame_cust) & set(all_cust)
+        customers = self.customers.frame
+        frameorders = self.frameorders.frame
+        cust, orders, uniques = utils.factorize_keys(
+            customers['Customer Number'], frameorders['CustomerNo'])
+        cust_mask = utils.semijoin(cust, orders, len(uniques))
+        order_mask = utils.semijoin(orders, cust, len(uniques))
+        self.orphans = orphans(
+            [('Orders without Account', order_mask, frameorders['CustomerNo']),
+             ('Accounts without Orders', cust_mask,
+              customers['Customer Number'])])
         if join:
-            self.customers.frame = \
-                self.customers.frame.loc[
-                    self.customers.frame['Customer Number'].isin(cust)]\
-                .reset_index(drop=True)
-            self.frameorders.frame = \
-                self.frameorders.frame.loc[
-                    self.frameorders.frame['CustomerNo'].isin(cust)]\
-                .reset_index(drop=True)
-
-    @ardec.stage('export_accounts')
+            customers = customers.loc[cust_mask].reset_index(drop=True)
+            frameorders = frameorders.loc[order_mask].reset_index(drop=True)
+            cust = cust[cust_mask]
+            orders = orders[order_mask]
+            self.customers.frame = customers
+            self.frameorders.frame = frameorders
+
+        # Shard orders by their customer codes rather than re-hashing
+        self.frameorders.columns['Shard Key'] = \
+            pandas.Series(orders, index=frameorders.index)
+
+    @profiling.stage('export_accounts',
+                     inputs=['customers'],
+                     outputs=['accounts'])
     def export_accounts(self):
         self.accounts = self.customers.accounts()
         return self.accounts
 
-    @ardec.stage('export_contacts')
+    @profiling.stage('export_contacts',
+                     inputs=['customers'],
+                     outputs=['contacts'])
     def export_contacts(self):
         self.contacts = self.customers.contacts()
         return self.contacts
 
-    @ardec.stage('export_orders')
+    @profiling.stage('export_orders',
+                     inputs=['frameorders'],
+                     outputs=['orders'])
     def export_orders(self):
-        self.orders = self.frameorders.orders()
+        self.orders = self.frameorders.transform('orders')
         return self.orders
 
-    @ardec.stage('export_treatments')
+    @profiling.stage('export_treatments',
+                     inputs=['frameorders'],
+                     outputs=['treatments'])
     def export_treatments(self):
-        self.treatments = self.frameorders.treatments()
+        self.treatments = self.frameorders.transform('treatments')
         return self.treatments
 
-    @ardec.stage('write_csv')
-    def write_csv(self):
-        kwargs = {'index': False, 'date_format': '%m/%d/%Y %H:%M:%S'}
-        path = "/data/{}.csv"
-        self.accounts.to_csv(path.format('Accounts'), **kwargs)
-        self.contacts.to_csv(path.format('Contacts'), **kwargs)
-        self.orders.to_csv(path.format('Orders'), **kwargs)
-        self.treatments.to_csv(path.format('Treatments'), **kwargs)
+    @profiling.stage('spill_frameorders', outputs=['partitions'])
+    def spill_frameorders(self):
+        """ Parse FrameOrders into on-disk partitions within max_memory. """
+        self.spills = tempfile.TemporaryDirectory(prefix='stanhope-')
+        self.partitions = Spill(self.spills.name, 'FrameOrders',
+                                self.max_memory // WORKING, concat=concat)
+        return self.frameorders.spill(self.partitions)
+
+    @profiling.stage('export_partitions',
+                     inputs=['customers', 'partitions'],
+                     outputs=['orders', 'treatments'])
+    def export_partitions(self, epoch=None, join=False):
+        """ Filter, join and export FrameOrders one partition at a time.
+
+            Equivalent to time_filter, join_records, export_orders and
+            export_treatments; outputs are Spills of their partitions.
+        """
+        customers = self.customers.frame
+        present = numpy.zeros(len(customers), dtype=bool)
+        orphaned = []
+        count = 0
+        self.orders = Spill(self.spills.name, 'Orders')
+        self.treatments = Spill(self.spills.name, 'Treatments')
+        for frame in self.partitions:
+            if epoch:
+                frame = self.since(frame, epoch)
+            cust, orders, uniques = utils.factorize_keys(
+                customers['Customer Number'], frame['CustomerNo'])
+            present |= utils.semijoin(cust, orders, len(uniques))
+            mask = utils.semijoin(orders, cust, len(uniques))
+            orphaned.append(frame['CustomerNo'][~mask].unique()[:SAMPLES])
+            count += int((~mask).sum())
+            if join:
+                frame = frame.loc[mask].reset_index(drop=True)
+                orders = orders[mask]
+            self.frameorders.frame = frame
+            self.frameorders.columns['Shard Key'] = \
+                pandas.Series(orders, index=frame.index)
+            self.orders.append(self.frameorders.transform('orders'))
+            self.treatments.append(self.frameorders.transform('treatments'))
+        self.frameorders.frame = None
+
+        accounts = customers['Customer Number'][~present]
+        self.orphans = tally(
+            [('Orders without Account', count,
+              pandas.unique(numpy.concatenate(orphaned))),
+             ('Accounts without Orders', len(accounts), accounts.unique())])
+        if join:
+            self.customers.frame = \
+                customers.loc[present].reset_index(drop=True)
+
+    @profiling.stage('diff_manifest',
+                     inputs=['accounts', 'contacts', 'orders', 'treatments'],
+                     outputs=['accounts', 'contacts', 'orders', 'treatments'])
+    def diff_manifest(self, path, deleted=False):
+        previous = manifest.load(path)
+        self.manifest = collections.OrderedDict()
+        self.deleted = collections.OrderedDict() if deleted else None
+        for name, frame in self.outputs.items():
+            current = self.manifest[name] = manifest.index(frame)
+            prior = previous.get(name, {})
+            setattr(self, name.lower(), manifest.delta(frame, current, prior))
+            if deleted:
+                self.deleted[name] = pandas.DataFrame(
+                    {'Legacy ID': manifest.deleted(current, prior)})
+
+    @profiling.stage('write_csv', inputs=written)
+    def write_csv(self, names=None):
+        suffix = '' if self.manifest is None else '-Delta'
+        outputs = collections.OrderedDict(
+            ('{}{}'.format(name, suffix), frame)
+            for name, frame in self.outputs.items()
+            if names is None or name in names)
+        for name, frame in (self.deleted or {}).items():
+            if names is None or name in names:
+                outputs['{}-Deleted'.format(name)] = frame
+        if self.legacy is not None:
+            outputs = self.legacy.split(outputs)
+        return self.writer.write(outputs)
 
-    @ardec.stage('report')
+    @profiling.stage('save_manifest')
+    def save_manifest(self, path):
+        manifest.dump(self.manifest, path)
+
+    @profiling.stage('report',
+                     inputs=['accounts', 'contacts', 'orders', 'treatments'])
     def report(self):
         total = len(self.accounts) + len(self.contacts) + len(self.orders) \
             + len(self.treatments)
@@ -88,3 +264,155 @@ class StanhopeFramers(ardec.migration):
             ('Treatments', '{:,}'.format(len(self.treatments))),
             ('Total', '{:,}'.format(total))]))
         print("\n{}\n".format(serie.to_string()))
+        if self.orphans is not None and self.orphans['Count'].any():
+            print("{}\n".format(self.orphans.to_string()))
+
+    def schedule(self, epoch=None, join=False, since_manifest=None,
+                 deleted=False, workers=None):
+        """ Schedule the stages of a full migration by their dependencies.
+
+            Loads run concurrently, as do the exports once records are
+            joined. Outputs are written concurrently once reported, so the
+            report is not interleaved with the writes' log.
+
+            Returns:
+                Scheduler of the stages.
+        """
+        scheduler = Scheduler(workers)
+        scheduler.add('load_customers', self.load_customers)
+        if self.max_memory:
+            scheduler.add('spill_frameorders', self.spill_frameorders)
+            scheduler.add('export_partitions', self.export_partitions, epoch,
+                          join, after=['load_customers', 'spill_frameorders'])
+            exports = ['export_accounts', 'export_contacts']
+            for export in exports:
+                scheduler.add(export, getattr(self, export),
+                              after=['export_partitions'])
+            exports += ['export_partitions'] * 2
+        else:
+            scheduler.add('load_frameorders', self.load_frameorders)
+            scheduler.add('time_filter', self.time_filter, epoch,
+                          after=['load_frameorders'])
+            scheduler.add('join_records', self.join_records, join,
+                          after=['load_customers', 'time_filter'])
+            exports = []
+            for name in self.outputs:
+                export = 'export_{}'.format(name.lower())
+                scheduler.add(export, getattr(self, export),
+                              after=['join_records'])
+                exports.append(export)
+        if since_manifest:
+            scheduler.add('diff_manifest', self.diff_manifest, since_manifest,
+                          deleted, after=exports)
+            scheduler.add('report', self.report, after=['diff_manifest'])
+            scheduler.add('write_csv', self.write_csv, after=['report'])
+            scheduler.add('save_manifest', self.save_manifest,
+                          since_manifest, after=['write_csv'])
+        else:
+            scheduler.add('report', self.report, after=exports)
+            for name, export in zip(self.outputs, exports):
+                scheduler.add('write_{}'.format(name.lower()), self.write_csv,
+                              [name], after=[export, 'report'])
+        return scheduler
+
+    def watch(self, epoch=None, join=False, interval=1.0):
+        """ Keep outputs fresh as the .mdb changes, until interrupted.
+
+            Loaded source pages are kept, and on each change to the .mdb
+            only the stages and outputs affected by the source tables whose
+            exports differ are re-run.
+
+            Arguments:
+                epoch    (str):    Earliest migrated Order Date
+                join     (bool):   Join Customers/Orders on CustomerNo
+                interval (float):  Seconds between checks of the .mdb
+        """
+        for table in [self.customers, self.frameorders]:
+            if table.pages is None:
+                table.pages = {}
+            table.changed()
+        fingerprint = utils.fingerprint(self.path)
+        while True:
+            time.sleep(interval)
+            try:
+                current = utils.fingerprint(self.path)
+            except OSError:
+                # Mid-save by Access
+                continue
+            if current == fingerprint:
+                continue
+            try:
+                with self:
+                    self.refresh(epoch, join)
+            except subprocess.CalledProcessError as err:
+                self.log('!! {}; retrying\n'.format(err))
+                for table in [self.customers, self.frameorders]:
+                    table.digests = {}
+                continue
+            fingerprint = current
+
+    def refresh(self, epoch=None, join=False):
+        """ Re-run the stages affected by changed source tables.
+
+            Returns:
+                List of re-written output names.
+        """
+        customers = self.customers.changed()
+        frameorders = self.frameorders.changed()
+        names = []
+        if not customers and not frameorders:
+            return names
+        if customers or join:
+            self.load_customers(customers)
+            names += ['Accounts', 'Contacts']
+        if frameorders or join:
+            self.load_frameorders(frameorders)
+            self.time_filter(epoch)
+            names += ['Orders', 'Treatments']
+        if names:
+            self.join_records(join)
+        if 'Accounts' in names:
+            self.export_accounts()
+            self.export_contacts()
+        if 'Orders' in names:
+            self.export_orders()
+            self.export_treatments()
+        if names:
+            self.report()
+            self.write_csv(names)
+        return names
+
+
+def orphans(sides, samples=SAMPLES):
+    """ Report rows without a match on the other side of a join.
+
+        Arguments:
+            sides   (list):  (name, matched mask, keys) of each side
+            samples (int):   Number of sample orphan keys per side
+
+        Returns:
+            DataFrame of orphan counts and sample keys by side.
+    """
+    tallies = []
+    for name, mask, series in sides:
+        orphaned = series[~mask]
+        tallies.append((name, len(orphaned), orphaned.unique()))
+    return tally(tallies, samples)
+
+
+def tally(tallies, samples=SAMPLES):
+    """ Report orphan counts and sample keys.
+
+        Arguments:
+            tallies (list):  (name, count, unique orphan keys) of each side
+            samples (int):   Number of sample orphan keys per side
+
+        Returns:
+            DataFrame of orphan counts and sample keys by side.
+    """
+    return pandas.DataFrame(
+        collections.OrderedDict([
+            ('Count', [count for _, count, _ in tallies]),
+            ('Sample', [', '.join(str(x) for x in keys[:samples])
+                        for _, _, keys in tallies])]),
+        index=[name for name, _, _ in tallies])
@@ -4,23 +4,158 @@ CLI Options
 import click
 
 
+API_KEY = click.option('--api-key',
+                       envvar='KNACK_API_KEY',
+                       help='Knack REST API key [env: KNACK_API_KEY]',
+                       required=True)
+APP_ID = click.option('--app-id',
+                      envvar='KNACK_APP_ID',
+                      help='Knack application ID [env: KNACK_APP_ID]',
+                      required=True)
 ARCHIVED = click.option('-a', '--archived',
                         flag_value='FrameOrders-Archive',
                         help='Migrate FrameOrders-Archive',
                         is_flag=True)
+BATCH_SIZE = click.option('--batch-size',
+                          default=100,
+                          help='Records per upload batch and checkpoint',
+                          show_default=True,
+                          type=int)
+CACHE_DIR = click.option('--cache-dir',
+                         default='/data/.stanhope-cache',
+                         help='Directory of cached mdb-export output',
+                         show_default=True,
+                         type=click.Path(file_okay=False))
+CACHE_SIZE = click.option('--cache-size',
+                          default=2048,
+                          help='Maximum size of export cache in MB',
+                          show_default=True,
+                          type=int)
+CHECKPOINT = click.option('--checkpoint',
+                          help='Upload checkpoint file '
+                               '[default: OUTPUT_DIR/.upload.json]',
+                          type=click.Path(dir_okay=False))
+CHUNKSIZE = click.option('-k', '--chunksize',
+                         type=int,
+                         help='Parse mdb-export output in chunks of N rows '
+                              '(bounds parsing memory; loaded tables are '
+                              'still held whole unless --max-memory is set)')
+CLEAR_CACHE = click.option('--clear-cache',
+                           is_flag=True,
+                           help='Clear cached mdb-export output')
 CLOSED = click.option('-c', '--closed',
                       flag_value='FrameOrders-Closed',
                       help='Migrate FrameOrders-Closed',
                       is_flag=True)
+COMPRESSION = click.option('--compression',
+                           help='Compress CSVs',
+                           type=click.Choice(['bz2', 'gzip', 'xz']))
+CONNECTIONS = click.option('--connections',
+                           default=8,
+                           help='Number of concurrent Knack connections',
+                           show_default=True,
+                           type=int)
+CPROFILE = click.option('--cprofile',
+                        help='Dump cProfile stats of each stage to directory '
+                             '(implies --profile)',
+                        type=click.Path(file_okay=False))
+DELETED = click.option('-D', '--deleted',
+                       is_flag=True,
+                       help='Write Legacy IDs deleted since the manifest')
 EPOCH = click.option('-[', '--epoch',
                      help='Earliest migrated Order Date')
 INTERACTIVE = click.option('-i', '--interactive',
                            is_flag=True,
                            help='Open IPython session after migrations')
+JOBS = click.option('-j', '--jobs',
+                    default=4,
+                    help='Number of independent stages run concurrently',
+                    show_default=True,
+                    type=int)
 JOIN = click.option('-I', '--join',
                     is_flag=True,
                     help='Join Customers/Orders on CustomerNo')
+KNACK_URL = click.option('--knack-url',
+                         default='https://api.knack.com/v1',
+                         help='Knack REST API URL',
+                         show_default=True)
+LEGACY_RECORDS = click.option('--legacy-records',
+                              default='inline',
+                              help='Embed Legacy Records in the CSVs, or '
+                                   'write them to <Output>-Legacy.jsonl.gz '
+                                   'stores keyed by Legacy ID',
+                              show_default=True,
+                              type=click.Choice(['inline', 'jsonl']))
+MANIFEST = click.option('-m', '--since-manifest',
+                        type=click.Path(dir_okay=False),
+                        help='Migrate only rows changed since manifest')
+MAX_MEMORY = click.option('--max-memory',
+                          help='Process FrameOrders in on-disk partitions to '
+                               'stay within about N MB (parsing holds a '
+                               'whole table unless --chunksize is set)',
+                          type=float)
+MDB = click.option('--mdb', 'mdbs',
+                   help='.mdb file or glob to migrate, repeatable; several '
+                        'files are migrated in parallel into an output '
+                        'directory each  [default: /data/StanhopeFramers.mdb]',
+                   multiple=True)
+NO_CACHE = click.option('--no-cache',
+                        is_flag=True,
+                        help='Bypass cached mdb-export output')
+OBJECTS = click.option('--object', 'objects',
+                       help='Upload output NAME to Knack object KEY',
+                       metavar='NAME=KEY',
+                       multiple=True,
+                       required=True)
 OPENED = click.option('-o', '--opened',
                       flag_value='FrameOrders-Working',
                       help='Migrate FrameOrders-Working',
                       is_flag=True)
+OUTPUT_DIR = click.option('-O', '--output-dir',
+                          default='/data',
+                          help='Directory of output CSVs',
+                          show_default=True,
+                          type=click.Path(file_okay=False))
+PIPELINES = click.option('--pipelines',
+                         help='Number of .mdb files migrated at once  '
+                              '[default: one per CPU]',
+                         type=int)
+PROFILE = click.option('--profile',
+                       is_flag=True,
+                       help='Profile stages to profile.json in output dir')
+RESTART = click.option('--restart',
+                       is_flag=True,
+                       help='Discard upload checkpoint and start over')
+SHARD_ROWS = click.option('--shard-rows',
+                          help='Split CSVs into shards of at most N rows',
+                          type=int)
+SHARD_SIZE = click.option('--shard-size',
+                          help='Split CSVs into shards of at most N MB '
+                               '(before compression)',
+                          type=float)
+SNAPSHOT_DIR = click.option('--snapshot-dir',
+                            help='Reuse typed snapshots of loaded tables '
+                                 '(requires pyarrow)',
+                            type=click.Path(file_okay=False))
+TAG = click.option('-T', '--tag',
+                   is_flag=True,
+                   help='Tag FrameOrders rows with their source Table')
+WATCH = click.option('-w', '--watch',
+                     is_flag=True,
+                     help='Keep running and refresh outputs when the .mdb '
+                          'changes')
+WATCH_INTERVAL = click.option('--watch-interval',
+                              default=1.0,
+                              help='Seconds between checks of the .mdb',
+                              show_default=True,
+                              type=float)
+WORKERS = click.option('--workers',
+                       default=1,
+                       help='Number of processes transforming FrameOrders',
+                       show_default=True,
+                       type=int)
+WRITERS = click.option('--writers',
+                       default=4,
+                       help='Number of CSV files written concurrently',
+                       show_default=True,
+                       type=int)
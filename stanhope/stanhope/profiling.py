@@ -0,0 +1,169 @@
+"""
+Migration Profiling
+
+Per-stage wall time, CPU time, peak memory, row counts and mdb-export
+subprocess time, with optional cProfile dumps.
+"""
+import cProfile
+import collections
+import contextlib
+import functools
+import json
+import os
+import resource
+import time
+import tracemalloc
+
+import ardec
+import pandas
+from . import scheduler
+
+
+def stage(name, inputs=(), outputs=()):
+    """ ardec.stage that also records metrics when profiling.
+
+        Stages run by a scheduled task are named after the task, so tasks
+        running the same stage concurrently are told apart.
+
+        Arguments:
+            name    (str):    Stage name
+            inputs  (tuple):  Migration attributes read by the stage, or a
+                              function of the stage's arguments returning
+                              them
+            outputs (tuple):  Migration attributes written by the stage
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            label = scheduler.current() or name
+            profiler = getattr(self, 'profiler', None)
+
+            # ardec keeps the start time on the instance; one per call
+            if profiler is None:
+                with Stage(label):
+                    return func(self, *args, **kwargs)
+            attrs = inputs(self, *args, **kwargs) \
+                if callable(inputs) else inputs
+            with profiler.measure(label, rows(self, attrs)) as metrics:
+                with Stage(label):
+                    result = func(self, *args, **kwargs)
+                metrics['rows_out'] = rows(self, outputs)
+            return result
+        return wrapper
+    return decorator
+
+
+class Stage(ardec.stage):
+    """ ardec.stage naming the stage as it finishes too.
+
+        Stages run concurrently, so a finish may follow other stages' starts.
+    """
+    def __exit__(self, *exc):
+        self.log("-- {} -> {}s\n".format(self.name, self.delta()))
+        return False
+
+
+def rows(migration, attrs):
+    """ Total rows of migration frames or tables named by attrs. """
+    if not attrs:
+        return None
+    total = 0
+    for attr in attrs:
+        frame = getattr(migration, attr, None)
+        frame = getattr(frame, 'frame', frame)
+        total += len(frame) if frame is not None else 0
+    return total
+
+
+class Profiler(object):
+    def __init__(self, cprofile=None, memory=True):
+        self.cprofile = cprofile
+        self.memory = memory
+        self.stages = []
+
+    @contextlib.contextmanager
+    def measure(self, name, rows_in=None):
+        """ Measure a stage.
+
+            Arguments:
+                name    (str):  Stage name
+                rows_in (int):  Rows input to the stage
+
+            Yields:
+                dict of metrics recorded for the stage.
+        """
+        metrics = collections.OrderedDict([('stage', name),
+                                           ('rows_in', rows_in),
+                                           ('rows_out', None)])
+        if not self.memory:
+            pass
+        elif tracemalloc.is_tracing() and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.stop()
+            tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        children = _cpu(resource.RUSAGE_CHILDREN)
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        profile = cProfile.Profile() if self.cprofile else None
+        if profile is not None:
+            profile.enable()
+        try:
+            yield metrics
+        finally:
+            if profile is not None:
+                profile.disable()
+                os.makedirs(self.cprofile, exist_ok=True)
+                profile.dump_stats(
+                    os.path.join(self.cprofile, '{}.prof'.format(name)))
+            metrics['wall'] = time.perf_counter() - wall
+            metrics['cpu'] = time.process_time() - cpu
+            metrics['subprocess'] = _cpu(resource.RUSAGE_CHILDREN) - children
+            metrics['peak_traced'] = \
+                tracemalloc.get_traced_memory()[1] - base \
+                if self.memory else None
+            metrics['max_rss'] = _maxrss()
+            self.stages.append(metrics)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def frame(self):
+        return pandas.DataFrame(self.stages, columns=[
+            'stage', 'wall', 'cpu', 'subprocess', 'peak_traced', 'max_rss',
+            'rows_in', 'rows_out'])
+
+    def dump(self, path):
+        """ Write stage metrics to path as JSON. """
+        with open(path, 'w') as stream:
+            json.dump({'stages': self.stages}, stream, indent=2)
+
+    def report(self):
+        """ Print summary table of stage metrics. """
+        frame = self.frame().set_index('stage')
+        for col in ['wall', 'cpu', 'subprocess']:
+            frame[col] = frame[col].map('{:,.3f}s'.format)
+        for col in ['peak_traced', 'max_rss']:
+            frame[col] = frame[col].map(_megabytes)
+        for col in ['rows_in', 'rows_out']:
+            frame[col] = frame[col].map(_count)
+        print("\n{}\n".format(frame.to_string()))
+
+
+def _cpu(who):
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _maxrss():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _count(value):
+    return '' if pandas.isnull(value) else '{:,.0f}'.format(value)
+
+
+def _megabytes(value):
+    return '' if pandas.isnull(value) else '{:,.1f}MB'.format(value / 2 ** 20)
@@ -0,0 +1,75 @@
+"""
+Stage Scheduler
+
+Runs migration stages as a dependency graph, starting each stage on a
+thread pool as soon as the stages it depends on have finished.
+"""
+import collections
+import concurrent.futures
+import threading
+
+_local = threading.local()
+
+
+def current():
+    """ Name of the task running in this thread, if any. """
+    return getattr(_local, 'task', None)
+
+
+class Scheduler(object):
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.tasks = collections.OrderedDict()
+
+    def add(self, name, func, *args, after=()):
+        """ Add a task.
+
+            Arguments:
+                name  (str):       Task name
+                func  (callable):  Function to call with args
+                after (list):      Names of tasks that must finish first
+        """
+        for dep in after:
+            if dep not in self.tasks:
+                raise ValueError('{} depends on unknown task {}'.format(
+                    name, dep))
+        self.tasks[name] = (func, args, set(after))
+
+    def run(self):
+        """ Run tasks, each once its dependencies have finished.
+
+            Ready tasks start in the order they were added. With a single
+            worker, tasks run in exactly that order.
+
+            Returns:
+                OrderedDict of task name to result, in completion order.
+        """
+        results = collections.OrderedDict()
+        pending = collections.OrderedDict(self.tasks)
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(self.workers or 1) as pool:
+            while pending or running:
+                for name, (func, args, after) in list(pending.items()):
+                    if len(running) == (self.workers or 1):
+                        break
+                    if after.issubset(results):
+                        running[pool.submit(_call, name, func, args)] = name
+                        del pending[name]
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        concurrent.futures.wait(running)
+                        raise future.exception()
+                    results[name] = future.result()
+        return results
+
+
+def _call(name, func, args):
+    """ Call a task's function, naming the task for current(). """
+    _local.task = name
+    try:
+        return func(*args)
+    finally:
+        _local.task = None
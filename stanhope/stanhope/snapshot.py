@@ -0,0 +1,117 @@
+"""
+Table Snapshots
+
+Typed columnar snapshots of loaded tables in Feather format, so later runs
+can memory-map already parsed frames instead of re-parsing mdb-export
+output. Snapshots are keyed by the .mdb fingerprint, the table's load
+options and its SCHEMA and NORMALIZE, and validated against both their
+stored schema and the table's SCHEMA on reload.
+
+Tables Arrow cannot hold, such as inferred object columns mixing ints and
+strings, are not snapshotted.
+
+Requires pyarrow.
+"""
+import hashlib
+import json
+import os
+import warnings
+
+from stanhope import utils
+
+INDEX = '__index__'
+# Bump to invalidate snapshots written by older code
+VERSION = 1
+DTYPES = {str: 'object', 'datetime': 'datetime64[ns]'}
+
+
+class Snapshots(object):
+    def __init__(self, directory, path=utils.MDB):
+        self.directory = directory
+        self.path = path
+
+    def key(self, table):
+        """ Snapshot key of table's load. """
+        payload = json.dumps(utils.fingerprint(self.path) + [
+            VERSION, type(table).__name__, list(table.tables), table.tag,
+            table.chunksize, [list(x) for x in table.filters],
+            _token(table)])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def filenames(self, table):
+        base = os.path.join(self.directory, self.key(table))
+        return '{}.feather'.format(base), '{}.json'.format(base)
+
+    def load(self, table):
+        """ Load table frame from its snapshot.
+
+            Arguments:
+                table (Table):  Table to load
+
+            Returns:
+                DataFrame, or None if there is no valid snapshot.
+        """
+        from pyarrow import feather
+        data, meta = self.filenames(table)
+        try:
+            with open(meta) as stream:
+                schema = json.load(stream)
+            frame = feather.read_table(data, memory_map=True).to_pandas()
+        except (IOError, ValueError):
+            return None
+        if schema != _schema(frame) or not _conforms(table, frame):
+            return None
+        return frame.set_index(INDEX).rename_axis(None)
+
+    def save(self, table):
+        """ Save snapshot of loaded table frame.
+
+            Frames Arrow cannot hold are skipped with a warning.
+
+            Returns:
+                True if the snapshot was saved.
+        """
+        import pyarrow
+        from pyarrow import feather
+        os.makedirs(self.directory, exist_ok=True)
+        data, meta = self.filenames(table)
+        frame = table.frame.rename_axis(INDEX).reset_index()
+        try:
+            feather.write_feather(frame, data + '.tmp')
+        except pyarrow.ArrowException as err:
+            warnings.warn('{} not snapshotted: {}'.format(
+                type(table).__name__, err))
+            if os.path.exists(data + '.tmp'):
+                os.remove(data + '.tmp')
+            return False
+        with open(meta + '.tmp', 'w') as stream:
+            json.dump(_schema(frame), stream)
+        os.replace(data + '.tmp', data)
+        os.replace(meta + '.tmp', meta)
+        return True
+
+
+def _schema(frame):
+    return {'columns': [str(x) for x in frame.columns],
+            'dtypes': [str(x) for x in frame.dtypes]}
+
+
+def _token(table):
+    """ Declared dtypes and normalizers of table, as JSON-able values. """
+    schema = [[k, getattr(v, '__name__', v)] for k, v in table.SCHEMA.items()]
+    normalize = [[k, '{}.{}'.format(v.__module__, v.__qualname__)]
+                 for k, v in sorted(table.NORMALIZE.items())]
+    return [schema, normalize]
+
+
+def _conforms(table, frame):
+    """ Whether the declared dtypes of table's SCHEMA match frame.
+
+        Normalized columns may change dtype, so are left to the key.
+    """
+    for col, dtype in table.SCHEMA.items():
+        if dtype is None or col in table.NORMALIZE or col not in frame:
+            continue
+        if str(frame[col].dtype) != DTYPES.get(dtype, dtype):
+            return False
+    return True
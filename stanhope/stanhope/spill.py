@@ -0,0 +1,100 @@
+"""
+Out-of-Core Spills
+
+Frames too large to hold in memory at once, kept on disk as ordered
+partitions. Partitions are cast back to the dtypes concatenating them in
+memory would have given, so a frame processed one partition at a time
+renders exactly as the whole frame would.
+
+Partitions are pickled rather than written as Feather: inferred object
+columns may mix ints and strings, which Arrow cannot hold.
+"""
+import collections
+import os
+
+import numpy
+import pandas
+
+# Copies of a partition held while it is filtered, joined and exported
+WORKING = 8
+
+
+class Spill(object):
+    def __init__(self, directory, name, max_bytes=None, concat=pandas.concat):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.concat = concat
+        self.paths = []
+        self.samples = []
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        """ Yield partitions, cast to the dtypes of their concatenation.
+
+            Yields a single empty frame if no rows were spilled.
+        """
+        dtypes = self.dtypes()
+        if not self.paths:
+            yield dtypes
+        for path in self.paths:
+            yield cast(pandas.read_pickle(path), dtypes)
+
+    def append(self, frame):
+        """ Spill frame as partitions of about max_bytes in memory each.
+
+            Frames without rows are not spilled, but do count towards the
+            dtypes of the concatenation.
+        """
+        self.samples.append(sample(frame))
+        for start, stop in bounds(frame, self.max_bytes):
+            path = os.path.join(self.directory, '{}-{:06d}.pickle'.format(
+                self.name, len(self.paths)))
+            frame.iloc[start:stop].to_pickle(path)
+            self.paths.append(path)
+        self.rows += len(frame)
+
+    def dtypes(self):
+        """ Empty frame with the columns and dtypes of the concatenation. """
+        return self.concat(self.samples).iloc[:0]
+
+
+def sample(frame):
+    """ One-row frame of the first non-null value of each column.
+
+        Concatenating samples upcasts dtypes as concatenating the frames
+        would, since both depend only on dtypes and all-null columns.
+    """
+    if not len(frame):
+        return frame.iloc[:0]
+    columns = collections.OrderedDict()
+    for col in frame.columns:
+        series = frame[col]
+        pos = int(numpy.argmax(series.notnull().values))
+        columns[col] = series.iloc[[pos]].reset_index(drop=True)
+    return pandas.DataFrame(columns, columns=frame.columns)
+
+
+def cast(frame, dtypes):
+    """ Cast columns of frame to the dtypes of an empty frame. """
+    for col, dtype in dtypes.dtypes.items():
+        if pandas.api.types.is_categorical_dtype(dtype):
+            frame[col] = frame[col].cat.set_categories(dtype.categories)
+        elif frame[col].dtype != dtype:
+            frame[col] = frame[col].astype(dtype)
+    return frame
+
+
+def bounds(frame, max_bytes=None):
+    """ Row bounds splitting frame into parts of about max_bytes. """
+    if not len(frame):
+        return []
+    rows = len(frame)
+    if max_bytes:
+        size = frame.memory_usage(index=True, deep=True).sum()
+        rows = max(1, int(rows * max_bytes // max(size, 1)))
+    return [(start, min(start + rows, len(frame)))
+            for start in range(0, len(frame), rows)]
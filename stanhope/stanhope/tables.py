@@ -1,74 +1,359 @@
 """
 StanhopeFramers Tables
 """
-import io
-import subprocess
-
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import operator
+import os
+import shutil
+import tempfile
+import threading
+import warnings
+
+import numpy
 import pandas
 from stanhope import utils
 
-pandas.set_option('display.max_rows', 999)
-pandas.set_option('display.width', 999)
-pandas.set_option('display.max_colwidth', 999)
+OPERATORS = {'==': operator.eq,
+             '!=': operator.ne,
+             '<': operator.lt,
+             '<=': operator.le,
+             '>': operator.gt,
+             '>=': operator.ge}
 
 
 class Table(object):
-    def __init__(self, *tables):
+    # Column -> parse dtype: None (inferred), 'datetime' or a read_csv dtype
+    SCHEMA = collections.OrderedDict()
+    # Column -> vectorized normalizer applied to each parsed chunk
+    NORMALIZE = {}
+    LEGACY_ID = []
+    SHARD_KEY = None
+
+    def __init__(self, *tables, chunksize=None, tag=False, cache=None,
+                 workers=None, filters=None, path=utils.MDB):
         self.tables = tables or (type(self).__name__,)
+        self.path = path
+        self.chunksize = chunksize
+        self.tag = tag
+        self.cache = cache
+        self.workers = workers
+        self.filters = list(filters or [])
+        self.pages = None
+        self.digests = {}
+        self.lock = threading.RLock()
         self.frame = None
 
-    @staticmethod
-    def read(table):
-        cmd = ['mdb-export', '/data/StanhopeFramers.mdb', table]
-        out = subprocess.check_output(cmd)
-        return io.BytesIO(out)
-
-    def load(self):
-        frame = pandas.DataFrame()
-        for table in self.tables:
-            page = pandas.read_csv(self.read(table), **self.READ_CSV)
-            # page['Table'] = table
-            frame = frame.append(page)
+    @property
+    def frame(self):
+        return self._frame
+
+    @frame.setter
+    def frame(self, frame):
+        """ Replace frame, invalidating the derived columns of the old one. """
+        self._frame = frame
+        self.columns = {}
+
+    def derived(self, name, func):
+        """ Memoized column derived from frame, shared by all exports.
+
+            Arguments:
+                name  (str):       Cache key
+                func  (callable):  Function of frame returning a Series
+
+            Returns:
+                Series indexed like frame.
+        """
+        # Concurrent exports wait for, rather than repeat, the derivation
+        with self.lock:
+            if name not in self.columns:
+                self.columns[name] = func(self.frame)
+            return self.columns[name]
+
+    def legacy_ids(self):
+        return self.derived(
+            'Legacy ID', lambda x: utils.legacy_ids(x[self.LEGACY_ID]))
+
+    def export(self, table):
+        """ Stream table as CSV, through the export cache if enabled. """
+        if self.cache is not None:
+            return self.cache.export(table)
+        return utils.mdb_export(table, self.path)
+
+    def read_csv(self):
+        """ read_csv keyword arguments of SCHEMA. """
+        kwargs = {}
+        dtype = {k: v for k, v in self.SCHEMA.items()
+                 if v is not None and v != 'datetime'}
+        dates = [k for k, v in self.SCHEMA.items() if v == 'datetime']
+        if dtype:
+            kwargs['dtype'] = dtype
+        if dates:
+            kwargs['parse_dates'] = dates
+        return kwargs
+
+    def normalize(self, frame):
+        """ Apply NORMALIZE to a parsed chunk. """
+        for col, func in self.NORMALIZE.items():
+            if col in frame:
+                frame[col] = func(frame[col])
+        return frame
+
+    def validate(self, table, frame):
+        """ Warn about columns that drifted from SCHEMA. """
+        if not self.SCHEMA:
+            return
+        missing = [x for x in self.SCHEMA if x not in frame.columns]
+        unknown = [x for x in frame.columns if x not in self.SCHEMA]
+        if missing or unknown:
+            warnings.warn('{} schema drift: missing {}, unknown {}'.format(
+                table, missing, unknown))
+
+    @contextlib.contextmanager
+    def drained(self, tables):
+        """ Run the exports of tables concurrently, draining them to disk.
+
+            Parsing holds the GIL, so exports are overlapped rather than
+            parses: each is copied to a temporary file, or through the
+            export cache if enabled, as mdb-export writes it.
+
+            Arguments:
+                tables (list):  Tables to export
+
+            Yields:
+                dict of table to drained file, or to None for cached ones.
+        """
+        if len(tables) < 2:
+            yield {}
+            return
+        with tempfile.TemporaryDirectory(prefix='stanhope-') as directory:
+            def drain(table):
+                if self.cache is not None:
+                    with self.cache.export(table) as pipe:
+                        while pipe.read(utils.BLOCKSIZE):
+                            pass
+                    return None
+                path = os.path.join(directory, '{}.csv'.format(table))
+                with self.export(table) as pipe, open(path, 'wb') as stream:
+                    shutil.copyfileobj(pipe, stream, utils.BLOCKSIZE)
+                return path
+
+            with concurrent.futures.ThreadPoolExecutor(len(tables)) as pool:
+                yield dict(zip(tables, pool.map(drain, tables)))
+
+    def iterload(self, table, path=None):
+        """ Yield parsed chunks of table as mdb-export streams them.
+
+            Arguments:
+                table (str):  Table to parse
+                path  (str):  File the export was drained to (optional)
+        """
+        kwargs = self.read_csv()
+        export = self.export(table) if path is None else open(path, 'rb')
+        with export as pipe:
+            if self.chunksize:
+                for chunk in pandas.read_csv(
+                        pipe, chunksize=self.chunksize, **kwargs):
+                    yield select(self.normalize(chunk), self.filters)
+            else:
+                frame = self.normalize(pandas.read_csv(pipe, **kwargs))
+                yield select(frame, self.filters)
+
+    def page(self, table, path=None):
+        """ Load a single source table.
+
+            Chunking bounds the memory of parsing, and filters drop rows
+            chunk by chunk, but the loaded page holds every kept row. Use
+            ``spill`` to keep no more than a chunk in memory.
+
+            Arguments:
+                table (str):  Table to load
+                path  (str):  File the export was drained to (optional)
+        """
+        chunks = list(self.iterload(table, path))
+        # Empty chunks would upcast dtypes in concat; keep one for columns
+        page = concat([x for x in chunks if len(x)] or chunks[:1])
+        self.validate(table, page)
+        if self.tag:
+            page['Table'] = table
+        return page
+
+    def load(self, tables=None):
+        """ Load source tables and concatenate them once.
+
+            Exports run concurrently; pages are parsed one after another.
+            Pages are kept for reuse once ``pages`` is set to a dict.
+
+            Arguments:
+                tables (list):  Tables to reload, reusing the kept pages of
+                                the others (optional)
+        """
+        if tables is None or self.pages is None:
+            tables = self.tables
+        else:
+            tables = [x for x in self.tables
+                      if x in tables or x not in self.pages]
+        with self.drained(tables) as paths:
+            pages = [self.page(x, paths.get(x)) for x in tables]
+        if self.pages is not None:
+            self.pages.update(zip(tables, pages))
+            pages = [self.pages[x] for x in self.tables]
+        frame = concat(pages)
         self.frame = frame
         return frame
 
+    def spill(self, spill):
+        """ Parse source tables into a Spill instead of frame.
+
+            Chunks are spilled as they are parsed, so only one chunk (or
+            table, without chunksize) is held in memory at a time. The
+            partitions concatenate to the frame ``load`` would give.
+
+            Arguments:
+                spill (Spill):  Spill of partitions
+        """
+        with self.drained(self.tables) as paths:
+            for table in self.tables:
+                rows = 0
+                first = None
+                for chunk in self.iterload(table, paths.get(table)):
+                    if first is None:
+                        self.validate(table, chunk)
+                        first = chunk
+                    if self.tag:
+                        chunk['Table'] = table
+                    if len(chunk):
+                        spill.append(chunk)
+                        rows += len(chunk)
+                # Empty chunks only count when the whole table is empty
+                if not rows:
+                    spill.append(first)
+        return spill
+
+    def digest(self, table):
+        """ SHA1 of a source table's raw export. """
+        sha1 = hashlib.sha1()
+        with self.export(table) as pipe:
+            for block in iter(lambda: pipe.read(utils.BLOCKSIZE), b''):
+                sha1.update(block)
+        return sha1.hexdigest()
+
+    def changed(self):
+        """ Source tables whose exports changed since last checked. """
+        digests = {x: self.digest(x) for x in self.tables}
+        changed = [x for x in self.tables if digests[x] != self.digests.get(x)]
+        self.digests = digests
+        return changed
+
+    def shards(self, count):
+        """ Partition frame by SHARD_KEY.
+
+            Rows are assigned by the 'Shard Key' derived column: a hash of
+            SHARD_KEY, unless join codes were stored there already.
+
+            Arguments:
+                count (int):  Number of shards
+
+            Returns:
+                List of (positions, frame) of the non-empty shards.
+        """
+        def hashes(frame):
+            return pandas.util.hash_pandas_object(
+                frame[self.SHARD_KEY], index=False)
+
+        keys = self.derived('Shard Key', hashes)
+        codes = keys.values % keys.values.dtype.type(count)
+        positions = [numpy.flatnonzero(codes == x) for x in range(count)]
+        return [(x, self.frame.iloc[x]) for x in positions if len(x)]
+
+    def transform(self, method):
+        """ Run a per-row transform, sharded over a process pool.
+
+            Falls back to running in this process with fewer than two
+            workers or rows, or without a SHARD_KEY. Sharded transforms of
+            the same table run one at a time.
+
+            Arguments:
+                method (str):  Name of transform method, eg. 'orders'
+
+            Returns:
+                Transformed frame, in the original row order.
+        """
+        workers = self.workers or 1
+        if workers < 2 or len(self.frame) < 2 or self.SHARD_KEY is None:
+            return getattr(self, method)()
+        # Concurrent transforms take turns: each would start a pool of its
+        # own, and a later one reuses the columns an earlier one derived
+        with self.lock:
+            shards = self.shards(workers)
+            jobs = [(type(self), method, frame,
+                     {k: v.iloc[pos] for k, v in self.columns.items()})
+                    for pos, frame in shards]
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_transform, jobs))
+            order = numpy.argsort(numpy.concatenate([x for x, _ in shards]),
+                                  kind='mergesort')
+
+            # Keep columns derived by the workers for later transforms
+            for name in set(results[0][1]) - set(self.columns):
+                self.columns[name] = pandas.concat(
+                    [columns[name] for _, columns in results]).iloc[order]
+
+        return pandas.concat([frame for frame, _ in results]).iloc[order]
+
 
 class Customers(Table):
-    READ_CSV = {
-        'converters': {
-            'Customer Number': utils.upper,
-            'Credit': utils.boolean,
-            'Tax Exempt': utils.boolean,
-            'Deceased': utils.boolean},
-        'parse_dates': [
-            'Date',
-            'Last Order',
-            'Last Update']}
+    SCHEMA = collections.OrderedDict([
+        ('Customer Number', str),
+        ('Name', None),
+        ('Address', None),
+        ('City', None),
+        ('State', None),
+        ('Zip', None),
+        ('Telephone', None),
+        ('Email', None),
+        ('Date', 'datetime'),
+        ('Last Order', 'datetime'),
+        ('Last Update', 'datetime'),
+        ('Deceased', 'category'),
+        ('Credit', 'category'),
+        ('Tax Exempt', 'category'),
+        ('Category', 'category'),
+        ('Source', 'category'),
+        ('Comment', None)])
+    NORMALIZE = {
+        'Customer Number': utils.uppers,
+        'Credit': utils.booleans,
+        'Tax Exempt': utils.booleans,
+        'Deceased': utils.booleans}
+    LEGACY_ID = ['Customer Number']
+
+    def names(self):
+        """ Names with newlines replaced, shared by accounts and contacts. """
+        return self.derived(
+            'Name', lambda x: utils.replace_newlines(x[['Name']])['Name'])
 
     def accounts(self):
-        frame = self.frame.copy()
+        # Project used columns
+        frame = self.frame.drop(['Address',
+                                 'City',
+                                 'Date',
+                                 'Deceased',
+                                 'Email',
+                                 'Last Order',
+                                 'Last Update',
+                                 'State',
+                                 'Telephone',
+                                 'Zip'],
+                                axis=1)
 
         # Add Legacy ID
-        frame['Legacy ID'] = \
-            frame[['Customer Number']].apply(utils.legacy_id, axis=1)
+        frame['Legacy ID'] = self.legacy_ids()
 
         # Copy legacy record
-        frame['Legacy Record'] = frame.drop('Legacy ID', axis=1)\
-                                      .apply(utils.legacy_record, axis=1)
-
-        # Drop unused columns
-        frame.drop(['Address',
-                    'City',
-                    'Date',
-                    'Deceased',
-                    'Email',
-                    'Last Order',
-                    'Last Update',
-                    'State',
-                    'Telephone',
-                    'Zip'],
-                   axis=1,
-                   inplace=True)
+        frame['Legacy Record'] = utils.legacy_records(self.frame)
 
         # Rename columns
         frame.rename(inplace=True,
@@ -78,40 +363,32 @@ class Customers(Table):
 
         # Set account name
         frame.loc[:, 'Account'] = \
-            frame['Account'].apply(utils.replace_newline)\
-                            .combine_first(frame['Legacy Customer Number'])
+            self.names().combine_first(frame['Legacy Customer Number'])
         frame['Primary Contact'] = frame['Account']
 
         # Massage fields
-        frame.loc[~frame['Category'].isnull(), 'Category'] = \
-            frame.loc[~frame['Category'].isnull(), 'Category'].apply(
-                utils.account_category)
-        frame.loc[~frame['Source'].isnull(), 'Source'] = \
-            frame.loc[~frame['Source'].isnull(), 'Source'].apply(utils.source)
+        frame.loc[:, 'Category'] = utils.account_categories(frame['Category'])
+        frame.loc[:, 'Source'] = utils.sources(frame['Source'])
         frame.loc[:, 'Comments'] = \
-            frame['Comments'].apply(lambda x: utils.replace_newline(x, '\n'))
+            utils.replace_newlines(frame[['Comments']], '\n')['Comments']
 
         # Return
         return frame
 
     def contacts(self):
-        frame = self.frame.copy()
+        # Project used columns
+        frame = self.frame.drop(['Category',
+                                 'Comment',
+                                 'Credit',
+                                 'Date',
+                                 'Last Order',
+                                 'Last Update',
+                                 'Source',
+                                 'Tax Exempt'],
+                                axis=1)
 
         # Add Legacy ID
-        frame['Legacy ID'] = \
-            frame[['Customer Number']].apply(utils.legacy_id, axis=1)
-
-        # Drop unused columns
-        frame.drop(['Category',
-                    'Comment',
-                    'Credit',
-                    'Date',
-                    'Last Order',
-                    'Last Update',
-                    'Source',
-                    'Tax Exempt'],
-                   axis=1,
-                   inplace=True)
+        frame['Legacy ID'] = self.legacy_ids()
 
         # Rename columns
         frame.rename(inplace=True,
@@ -121,64 +398,87 @@ class Customers(Table):
 
         # Massage fields
         frame.loc[:, 'Contact'] = \
-            frame['Contact'].apply(utils.replace_newline)\
-                            .combine_first(frame['Account Link'])
-        frame.loc[:, 'Contact'] = frame['Contact'].apply(utils.replace_newline)
-        frame.loc[:, 'Address'] = frame['Address'].apply(utils.replace_newline)
-        frame.loc[:, 'City'] = frame['City'].apply(utils.replace_newline)
-        frame.loc[:, 'State'] = frame['State'].apply(utils.replace_newline)
-        frame.loc[:, 'Zip'] = frame['Zip'].apply(utils.replace_newline)
-        frame.loc[:, 'Telephone'] = \
-            frame['Telephone'].apply(utils.replace_newline)
+            self.names().combine_first(frame['Account Link'])
+        text = ['Contact', 'Address', 'City', 'State', 'Zip', 'Telephone']
+        cleaned = utils.replace_newlines(frame[text])
+        for col in text:
+            frame.loc[:, col] = cleaned[col]
 
         # Return
         return frame
 
 
 class FrameOrders(Table):
-    READ_CSV = {
-        'converters': {'CustomerNo': utils.upper, 'OrderNo': utils.upper},
-        'parse_dates': ['DateCompleted', 'DueDate', 'OrderDate']}
+    SCHEMA = collections.OrderedDict([
+        ('CustomerNo', str),
+        ('OrderNo', str),
+        ('OrderDate', 'datetime'),
+        ('DueDate', 'datetime'),
+        ('DateCompleted', 'datetime'),
+        ('Status', 'category'),
+        ('Location', 'category'),
+        ('SalesPers', 'category'),
+        ('Delivery', None),
+        ('Cust-Client', None),
+        ('Discount', None),
+        ('Artist', None),
+        ('BinNo', None),
+        ('Comments', None),
+        ('Fitting', None),
+        ('Frame Height', None),
+        ('Frame Width', None),
+        ('FrameMfg', 'category'),
+        ('FrameNo', None),
+        ('Glazing', 'category'),
+        ('Joining', None),
+        ('Mat', None),
+        ('MatColor', None),
+        ('MatMfg', None),
+        ('Matting', None),
+        ('MattingSize', None),
+        ('ProductionComments', None),
+        ('Qty', None),
+        ('SalesCatgy', None),
+        ('SalesType', 'category'),
+        ('TotalSale', None)])
+    NORMALIZE = {'CustomerNo': utils.uppers, 'OrderNo': utils.uppers}
+    LEGACY_ID = ['CustomerNo', 'OrderNo', 'OrderDate']
+    SHARD_KEY = 'CustomerNo'
 
     def orders(self):
-        frame = self.frame.copy()
+        # Project used columns
+        frame = self.frame.drop(['Artist',
+                                 'BinNo',
+                                 'Comments',
+                                 'DateCompleted',
+                                 'Fitting',
+                                 'Frame Height',
+                                 'Frame Width',
+                                 'FrameMfg',
+                                 'FrameNo',
+                                 'Glazing',
+                                 'Joining',
+                                 'Mat',
+                                 'MatColor',
+                                 'MatMfg',
+                                 'Matting',
+                                 'MattingSize',
+                                 'ProductionComments',
+                                 'Qty',
+                                 'SalesCatgy',
+                                 'SalesType',
+                                 'TotalSale'],
+                                axis=1)
 
         # Add Legacy ID
-        frame['Legacy ID'] = \
-            frame[['CustomerNo', 'OrderNo', 'OrderDate']]\
-            .apply(utils.legacy_id, axis=1)
+        frame['Legacy ID'] = self.legacy_ids()
 
         # Copy legacy record
-        frame['Legacy Record'] = frame.drop('Legacy ID', axis=1)\
-                                      .apply(utils.legacy_record, axis=1)
+        frame['Legacy Record'] = utils.legacy_records(self.frame)
 
         # Set status
-        frame.loc[frame['SalesType'] == 'VOID', 'Status'] = 'V'
-
-        # Drop unused columns
-        frame.drop(['Artist',
-                    'BinNo',
-                    'Comments',
-                    'DateCompleted',
-                    'Fitting',
-                    'Frame Height',
-                    'Frame Width',
-                    'FrameMfg',
-                    'FrameNo',
-                    'Glazing',
-                    'Joining',
-                    'Mat',
-                    'MatColor',
-                    'MatMfg',
-                    'Matting',
-                    'MattingSize',
-                    'ProductionComments',
-                    'Qty',
-                    'SalesCatgy',
-                    'SalesType',
-                    'TotalSale'],
-                   axis=1,
-                   inplace=True)
+        void = (self.frame['SalesType'] == 'VOID').values
+        frame['Status'] = frame['Status'].astype(object).where(~void, 'V')
 
         # Rename columns
         frame.rename(inplace=True,
@@ -194,14 +494,13 @@ class FrameOrders(Table):
 
         # Massage fields
         frame.loc[:, 'Delivery Location'] = \
-            frame['Delivery Location'].apply(utils.delivery_location)
-        frame.loc[:, 'Discount'] = frame['Discount'].apply(utils.discount)
+            utils.delivery_locations(frame['Delivery Location'])
+        frame.loc[:, 'Discount'] = utils.discounts(frame['Discount'])
         frame.loc[:, 'Order Location'] = \
-            frame['Order Location'].apply(utils.order_location)
-        frame.loc[:, 'Order Status'] = \
-            frame['Order Status'].apply(utils.status)
+            utils.order_locations(frame['Order Location'])
+        frame.loc[:, 'Order Status'] = utils.statuses(frame['Order Status'])
         frame.loc[:, 'Salesperson Link'] = \
-            frame['Salesperson Link'].apply(utils.salesperson)
+            utils.salespersons(frame['Salesperson Link'])
         frame.loc[:, 'Delivery Location'] = \
             frame['Delivery Location'].combine_first(frame['Order Location'])
 
@@ -209,34 +508,29 @@ class FrameOrders(Table):
         return frame
 
     def treatments(self):
-        frame = self.frame.copy()
+        # Project used columns
+        frame = self.frame.drop(['Cust-Client',
+                                 'CustomerNo',
+                                 'DateCompleted',
+                                 'Delivery',
+                                 'Discount',
+                                 'DueDate',
+                                 'Fitting',
+                                 'Location',
+                                 'Matting',
+                                 'OrderDate',
+                                 'OrderNo',
+                                 'SalesCatgy',
+                                 'SalesPers',
+                                 'Status'],
+                                axis=1)
 
         # Add Legacy ID
-        frame['Legacy ID'] = \
-            frame[['CustomerNo', 'OrderNo', 'OrderDate']]\
-            .apply(utils.legacy_id, axis=1)
+        frame['Legacy ID'] = self.legacy_ids()
 
         # Add Legacy Order ID
         frame['Order Link'] = frame['Legacy ID']
 
-        # Drop unused columns
-        frame.drop(['Cust-Client',
-                    'CustomerNo',
-                    'DateCompleted',
-                    'Delivery',
-                    'Discount',
-                    'DueDate',
-                    'Fitting',
-                    'Location',
-                    'Matting',
-                    'OrderDate',
-                    'OrderNo',
-                    'SalesCatgy',
-                    'SalesPers',
-                    'Status'],
-                   axis=1,
-                   inplace=True)
-
         # Rename fields
         frame.rename(inplace=True,
                      columns={'BinNo': 'Bin Number',
@@ -254,27 +548,78 @@ class FrameOrders(Table):
                               'TotalSale': 'Price'})
 
         # Massage fields
-        frame.loc[:, 'Frame Join'] = frame['Frame Join'].apply(utils.join)
+        frame.loc[:, 'Frame Join'] = utils.joins(frame['Frame Join'])
         frame.loc[:, 'Mat Manufacturer'] = \
-            frame['Mat Manufacturer'].apply(utils.matmfg)
+            utils.matmfgs(frame['Mat Manufacturer'])
         frame.loc[:, 'Frame Manufacturer'] = \
-            frame['Frame Manufacturer'].apply(utils.framemfg)
+            utils.framemfgs(frame['Frame Manufacturer'])
         frame.loc[:, 'Matting / Mounting'] = \
-            frame['Matting / Mounting'].apply(utils.mat)
-        frame.loc[:, 'Glazing'] = \
-            frame['Glazing'].apply(utils.glazing)
-        frame.loc[:, 'Treatment'] = frame['Treatment'].apply(utils.sales_type)
+            utils.mats(frame['Matting / Mounting'])
+        frame.loc[:, 'Glazing'] = utils.glazings(frame['Glazing'])
+        frame.loc[:, 'Treatment'] = utils.sales_types(frame['Treatment'])
 
         # Add dimensions
-        frame['Frame Width Inches'] = \
-            frame['Frame Width'].apply(utils.inches)
-        frame['Frame Width Fraction'] = \
-            frame['Frame Width'].apply(utils.fraction)
-        frame['Frame Height Inches'] = \
-            frame['Frame Height'].apply(utils.inches)
-        frame['Frame Height Fraction'] = \
-            frame['Frame Height'].apply(utils.fraction)
+        for dim in ['Frame Width', 'Frame Height']:
+            dims = utils.dimensions(frame[dim])
+            frame[dim + ' Inches'] = dims['Inches']
+            frame[dim + ' Fraction'] = dims['Fraction']
         frame.drop(['Frame Width', 'Frame Height'], axis=1, inplace=True)
 
         # Return
         return frame
+
+
+def select(frame, filters):
+    """ Select rows of frame matching all filters.
+
+        Columns sorted ascending are sliced by binary search; others are
+        masked.
+
+        Arguments:
+            frame   (DataFrame):  Frame to filter
+            filters (list):       (column, operator, value) tuples, eg.
+                                  ('OrderDate', '>=', '2010-01-01')
+
+        Returns:
+            Filtered frame, in its original row order.
+    """
+    for column, op, value in filters:
+        series = frame[column]
+        if series.dtype.kind == 'M':
+            value = pandas.Timestamp(value).to_datetime64()
+        if op in ['<', '<=', '>', '>='] and series.is_monotonic_increasing:
+            side = 'left' if op in ['<', '>='] else 'right'
+            bound = int(numpy.searchsorted(series.values, value, side=side))
+            frame = frame.iloc[bound:] if op[0] == '>' else frame.iloc[:bound]
+        else:
+            frame = frame.loc[OPERATORS[op](series, value).values]
+    return frame
+
+
+def concat(frames):
+    """ Concatenate frames, keeping category columns categorical.
+
+        Categories of each category column are unioned and sorted, as
+        read_csv does, since pandas falls back to object for mismatched ones.
+    """
+    frames = list(frames)
+    if len(frames) > 1:
+        for col, dtype in frames[0].dtypes.items():
+            if not pandas.api.types.is_categorical_dtype(dtype):
+                continue
+            union = pandas.api.types.union_categoricals(
+                [x[col] for x in frames if col in x],
+                sort_categories=True).categories
+            for frame in frames:
+                if col in frame:
+                    frame[col] = frame[col].cat.set_categories(union)
+    return pandas.concat(frames)
+
+
+def _transform(job):
+    """ Run a transform on one shard in a worker process. """
+    cls, method, frame, columns = job
+    table = cls()
+    table.frame = frame
+    table.columns.update(columns)
+    return getattr(table, method)(), table.columns
@@ -1,46 +1,282 @@
 """ Stanhope Framers Utils. """
+import collections
+import concurrent.futures
+import contextlib
 import fractions
 import hashlib
-import io
+import json
+import os
 import re
 import subprocess
 
+import numpy
 import pandas
+from pandas.io.formats.format import format_array
+
+BLOCKSIZE = 2 ** 20
+MDB = '/data/StanhopeFramers.mdb'
+DISPLAY = collections.OrderedDict([('display.max_rows', 999),
+                                   ('display.width', 999),
+                                   ('display.max_colwidth', 999)])
+
+
+def configure():
+    """ Set the DISPLAY options globally, eg. for interactive sessions. """
+    for key, value in DISPLAY.items():
+        pandas.set_option(key, value)
+
+
+def display():
+    """ Context of the DISPLAY options Legacy Records are rendered with. """
+    return pandas.option_context(*[x for item in DISPLAY.items()
+                                   for x in item])
 
 
 def legacy_record(row):
     row = row.dropna()
-    rec = row.to_string().replace(u'\x0b', '').replace(u'\x10', '')
+    with display():
+        rec = row.to_string()
+    rec = rec.replace(u'\x0b', '').replace(u'\x10', '')
     record = "<pre>\n{record}\n</pre>".format(record=rec)
     return re.subn(r'[\r\n]', '<br/>', record)[0]
 
 
+def legacy_records(frame):
+    """ Columnar equivalent of ``frame.apply(legacy_record, axis=1)``.
+
+        Formats each column once, masks out nulls and lays out every row
+        exactly as ``Series.to_string()`` would, with label padding computed
+        from the non-null columns of the row.
+
+        Arguments:
+            frame (DataFrame):  Frame of records
+
+        Returns:
+            Series of Legacy Record HTML strings indexed like frame.
+    """
+    with display():
+        return _legacy_records(frame)
+
+
+def _legacy_records(frame):
+    dtypes = set(_interleave(frame).dtypes)
+    if frame.empty or (len(dtypes) == 1 and object not in dtypes) \
+            or len(frame.columns) > pandas.get_option('display.max_rows') \
+            or not all(isinstance(x, str) for x in frame.columns):
+        # Rows are not object-dtype Series; use row-wise rendering
+        return frame.apply(legacy_record, axis=1)
+    maxwidth = pandas.get_option('display.max_colwidth')
+    labels = pandas.Index(list(frame.columns)).format()
+    mask = frame.notnull().values
+    values = []
+    for idx in range(len(frame.columns)):
+        col = frame.iloc[:, idx].astype(object).values
+        fmt = numpy.empty(len(col), dtype=object)
+        fmt[mask[:, idx]] = format_array(col[mask[:, idx]], None,
+                                         justify='all')
+        values.append(fmt)
+    records = []
+    for rownum, row in enumerate(zip(*values)):
+        cols = mask[rownum].nonzero()[0]
+        if cols.size == 0:
+            records.append(legacy_record(frame.iloc[rownum]))
+            continue
+        labelwidth = max(len(labels[x]) for x in cols) + 3
+        width = max(len(row[x]) for x in cols)
+        if maxwidth is not None and width > maxwidth:
+            width = maxwidth
+        rec = '\n'.join(
+            labels[x].ljust(labelwidth) + _truncate(row[x], width).rjust(width)
+            for x in cols)
+        rec = rec.replace(u'\x0b', '').replace(u'\x10', '')
+        record = "<pre>\n{record}\n</pre>".format(record=rec)
+        records.append(re.subn(r'[\r\n]', '<br/>', record)[0])
+    return pandas.Series(records, index=frame.index)
+
+
+def _truncate(value, width):
+    if width > 3 and len(value) > width:
+        return value[:width - 3] + '...'
+    return value
+
+
 def legacy_id(row):
     return hashlib.sha1(row.to_json().encode('utf-8')).hexdigest()
 
 
-def export(table, *args, **kwargs):
+def legacy_ids(frame, workers=None, executor='thread'):
+    """ Batched equivalent of ``frame.apply(legacy_id, axis=1)``.
+
+        Builds the canonical JSON for each column of the frame at once and
+        hashes the resulting payloads in bulk. Digests are byte-identical to
+        those of ``legacy_id``.
+
+        Arguments:
+            frame     (DataFrame):  Frame of columns to hash
+            workers   (int):        Number of hashing workers (optional)
+            executor  (str):        'thread' or 'process'
+
+        Returns:
+            Series of SHA1 hex digests indexed like frame.
+    """
+    if frame.empty:
+        return pandas.Series([], index=frame.index, dtype=object)
+    frame = _interleave(frame)
+    parts = []
+    for idx, name in enumerate(frame.columns):
+        key = '{sep}{key}:'.format(sep='{' if idx == 0 else ',',
+                                   key=_json_str(str(name)))
+        parts.append([key] * len(frame))
+        parts.append(_json_values(frame.iloc[:, idx]))
+    parts.append(['}'] * len(frame))
+    payloads = [''.join(x).encode('utf-8') for x in zip(*parts)]
+    return pandas.Series(_sha1_bulk(payloads, workers, executor),
+                         index=frame.index)
+
+
+def _interleave(frame):
+    """ Mimic the dtype upcasting of rows yielded by ``apply(axis=1)``. """
+    dtypes = list(frame.dtypes)
+    numeric = [pandas.api.types.is_numeric_dtype(x) for x in dtypes]
+    boolean = [pandas.api.types.is_bool_dtype(x) for x in dtypes]
+    if len(set(dtypes)) > 1 and all(numeric) and not any(boolean):
+        return frame.astype(numpy.result_type(*dtypes))
+    return frame
+
+
+def _json_str(value):
+    """ Encode str like pandas' ujson (escaped '/' and raw DEL). """
+    if u'\x7f' in value:
+        return pandas.Series([value]).to_json(orient='values')[1:-1]
+    return json.dumps(value).replace('/', '\\/')
+
+
+def _json_values(series):
+    """ Encode each value of a series like pandas' ``to_json``. """
+    if isinstance(series.dtype, numpy.dtype) and series.dtype.kind in 'biufM':
+        # Numbers, bools and dates never contain commas, so one encode can
+        # be split per cell; categories and extension types may hold text
+        return series.to_json(orient='values')[1:-1].split(',')
+    values = []
+    for value in series.astype(object).values:
+        if isinstance(value, str):
+            values.append(_json_str(value))
+        elif value is None or (isinstance(value, float) and value != value):
+            values.append('null')
+        else:
+            values.append(
+                pandas.Series([value], dtype=object)
+                .to_json(orient='values')[1:-1])
+    return values
+
+
+def _sha1(payloads):
+    return [hashlib.sha1(x).hexdigest() for x in payloads]
+
+
+def _sha1_bulk(payloads, workers=None, executor='thread'):
+    """ SHA1 hex digests of payloads, optionally split across workers. """
+    if not workers or workers < 2 or len(payloads) < workers:
+        return _sha1(payloads)
+    pool = concurrent.futures.ProcessPoolExecutor \
+        if executor == 'process' else concurrent.futures.ThreadPoolExecutor
+    size = -(-len(payloads) // workers)
+    chunks = [payloads[i:i + size] for i in range(0, len(payloads), size)]
+    with pool(max_workers=workers) as ex:
+        return [x for chunk in ex.map(_sha1, chunks) for x in chunk]
+
+
+def export(table, *args, path=MDB, **kwargs):
     """ Export table from StanhopeFramers.mdb.
 
         Arguments:
             table (str):  Name of table to export
+            path  (str):  Path to .mdb file
+
+        Returns:
+            DataFrame of table, or an iterator of DataFrames when
+            ``chunksize`` or ``iterator`` is given.
+    """
+    if kwargs.get('chunksize') or kwargs.get('iterator'):
+        return _iterexport(table, *args, path=path, **kwargs)
+    with mdb_export(table, path) as pipe:
+        return pandas.read_csv(pipe, *args, **kwargs)
+
+
+def _iterexport(table, *args, path=MDB, **kwargs):
+    with mdb_export(table, path) as pipe:
+        for chunk in pandas.read_csv(pipe, *args, **kwargs):
+            yield chunk
+
+
+@contextlib.contextmanager
+def mdb_export(table, path=MDB):
+    """ Stream table from StanhopeFramers.mdb as CSV.
+
+        Yields the stdout pipe of mdb-export so it can be parsed
+        incrementally instead of buffering the whole table in memory.
+
+        Arguments:
+            table (str):  Name of table to export
+            path  (str):  Path to .mdb file
+
+        Yields:
+            Binary file-like object of CSV output.
+    """
+    cmd = ['mdb-export', path, table]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    try:
+        yield proc.stdout
+    except Exception:
+        # Surface a failed export rather than the parse error it caused,
+        # but not one killed by SIGPIPE from closing the pipe early
+        if _wait(proc) > 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+        raise
+    finally:
+        _wait(proc)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def _wait(proc):
+    proc.stdout.close()
+    return proc.wait()
+
+
+def fingerprint(path=MDB):
+    """ Fast fingerprint of the .mdb file.
+
+        Hashes the size, mtime and the first and last blocks of the file
+        rather than its full contents.
+
+        Arguments:
+            path (str):  Path to .mdb file
 
         Returns:
-            DataFrame of table.
+            List of size, mtime in ns and hex digest.
     """
-    cmd = ['mdb-export', '/data/StanhopeFramers.mdb', table]
-    out = subprocess.check_output(cmd)
-    return pandas.read_csv(io.BytesIO(out), *args, **kwargs)
+    stat = os.stat(path)
+    digest = hashlib.sha1()
+    with open(path, 'rb') as stream:
+        digest.update(stream.read(BLOCKSIZE))
+        if stat.st_size > BLOCKSIZE:
+            stream.seek(max(BLOCKSIZE, stat.st_size - BLOCKSIZE))
+            digest.update(stream.read(BLOCKSIZE))
+    return [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+
+ACCOUNT_CATEGORY = {
+    'Artist': 'Artist',
+    'Dealer': 'Dealer',
+    'Employee': 'Employee',
+    'Gallery': 'Gallery',
+    'Other': 'Other',
+    'Retail': 'Retail'}
 
 
 def account_category(value):
-    return mapping(value.strip(), **{
-        'Artist': 'Artist',
-        'Dealer': 'Dealer',
-        'Employee': 'Employee',
-        'Gallery': 'Gallery',
-        'Other': 'Other',
-        'Retail': 'Retail'})
+    return mapping(value.strip(), **ACCOUNT_CATEGORY)
 
 
 def try_or_nan(func):
@@ -57,11 +293,65 @@ def knackstamp(value):
     return pandas.Timestamp(value).strftime('%m/%d/%Y %H:%M:%S')
 
 
+def factorize_keys(left, right):
+    """ Factorize two key columns into one shared index.
+
+        Arguments:
+            left  (Series):  Keys, eg. Customer Number
+            right (Series):  Keys referencing left, eg. CustomerNo
+
+        Returns:
+            Tuple of left codes, right codes and unique keys. Null keys
+            have code -1.
+    """
+    codes, uniques = pandas.factorize(
+        numpy.concatenate([numpy.asarray(left, dtype=object),
+                           numpy.asarray(right, dtype=object)]))
+    return codes[:len(left)], codes[len(left):], uniques
+
+
+def semijoin(codes, other, size):
+    """ Mask of codes present in other, from a shared key index.
+
+        Arguments:
+            codes (ndarray):  Codes of one side, from ``factorize_keys``
+            other (ndarray):  Codes of the other side
+            size  (int):      Number of unique keys
+
+        Returns:
+            Boolean ndarray like codes.
+    """
+    present = numpy.bincount(other[other >= 0], minlength=size) > 0
+    return (codes >= 0) & present[codes]
+
+
+def strftime(series, date_format):
+    """ Vectorized strftime formatting each distinct timestamp once.
+
+        Arguments:
+            series      (Series):  Datetime series
+            date_format (str):     strftime format
+
+        Returns:
+            Series of formatted strings, NaN for NaT.
+    """
+    codes, uniques = pandas.factorize(series)
+    values = numpy.append(
+        pandas.DatetimeIndex(uniques).strftime(date_format).astype(object),
+        numpy.nan)
+    return pandas.Series(values[codes], index=series.index)
+
+
 @try_or_nan
 def upper(value):
     return value.upper().strip()
 
 
+def uppers(series):
+    """ Vectorized ``upper``; nulls become '' as they did as converters. """
+    return series.fillna('').str.upper().str.strip()
+
+
 @try_or_nan
 def replace_newline(value, replace=r' '):
     return re.subn('[\n\r]+', replace, value)[0]\
@@ -71,55 +361,228 @@ def replace_newline(value, replace=r' '):
              .strip('`')
 
 
+NEWLINES = re.compile('[\n\r]+|[\x0b\x10]')
+
+
+def replace_newlines(frame, replace=r' '):
+    """ Vectorized ``replace_newline`` of every column of frame.
+
+        Values of all columns are factorized together and each distinct
+        string is cleaned once in a single ``.str`` pass; anything else
+        becomes NaN, as it does in ``replace_newline``.
+
+        Arguments:
+            frame   (DataFrame):  Frame of text columns
+            replace (str):        Replacement of newlines
+
+        Returns:
+            DataFrame of cleaned columns indexed like frame.
+    """
+    values = [numpy.asarray(frame.iloc[:, idx], dtype=object)
+              for idx in range(len(frame.columns))]
+    codes, uniques = pandas.factorize(
+        numpy.concatenate(values) if values else numpy.array([], object))
+    uniques = numpy.asarray(uniques, dtype=object)
+    strings = numpy.array([isinstance(x, str) for x in uniques], dtype=bool)
+    cleaned = numpy.full(len(uniques) + 1, numpy.nan, dtype=object)
+    if strings.any():
+        # Runs of \n or \r collapse, \x0b and \x10 are replaced one by one
+        cleaned[:-1][strings] = pandas.Series(uniques[strings]).str\
+            .replace(NEWLINES, replace).str.strip().str.strip('`').values
+    cleaned = cleaned[codes].reshape(len(frame.columns), len(frame))
+    return pandas.DataFrame(
+        collections.OrderedDict(zip(frame.columns, cleaned)),
+        index=frame.index, columns=frame.columns)
+
+
 @try_or_nan
 def mapping(value, **mapping):
     return mapping[value]
 
 
+SOURCE = {
+    'ART NE': 'Art New England',
+    'BAY WIN': 'BAY WIN',
+    'CN': 'CN',
+    'CO REF': 'CO REF',
+    'COUPON': 'Coupon',
+    'CR': 'CR',
+    'PC': 'PC',
+    'SMFA SALE': 'SMFA Sale',
+    'WBUR': 'WBUR',
+    'WEB': 'Web',
+    'WI': 'Walk In',
+    'WLK IN': 'Walk In',
+    'WLK': 'Walk In',
+    'YLW BK': 'Yellow Pages',
+    'YLW PG': 'Yellow Pages',
+    'YP': 'Yellow Pages'}
+
+DELIVERY_LOCATION = {'UPS': 'Delivery', 'PU BOS': 'Boston'}
+
+DISCOUNT = {
+    'Artist': 'Artist',
+    'Dealer': 'Dealer',
+    'Donation': 'Donation',
+    'Employee': 'Employee',
+    'Institution': 'Institution',
+    'Other': 'Other',
+    'Poster Special': 'Poster',
+    'SMFA Art Sale': 'SMFA',
+    'Smfa Art Sale': 'SMFA',
+    'Verbal': 'Verbal',
+    'WBUR': 'WBUR',
+    'Wbur': 'WBUR',
+    'gallery': 'Gallery',
+    'special': 'Special'}
+
+ORDER_LOCATION = {'BOS': 'Boston', 'SOM': 'Somerville'}
+
+STATUS = {
+    'O': 'Open',
+    'C': 'Closed',
+    'A': 'Closed',
+    'X': 'Closed',
+    'V': 'Void'}
+
+JOIN = {'Nailed': 'Nailed', 'Splined': 'Splined'}
+
+FRAMEMFG = {
+    # '': 'Don Mar',
+    # '': 'Frama',
+    'AMCI': 'AMCI',
+    'AMPF': 'AMPF',
+    'AOR': 'AOR',
+    'BAF/STANHOPE': 'Boston Art Framers,Stanhope',
+    'BOSTON ART FRAM': 'Boston Art Framers',
+    'Boston Art Fram': 'Boston Art Framers',
+    'CDNV': 'CDNV',
+    'CJ': 'CJ',
+    'CMI': 'CMI',
+    'DECOR': 'Décor',
+    'DÉCOR': 'Décor',
+    'FEINMAN': 'Feinman',
+    'LJ': 'LJ',
+    'MAX': 'MAX',
+    'NEW LOOK': 'New Look',
+    'NIELSEN': 'Nielsen',
+    'OEM': 'OEM',
+    'OMEGA': 'Omega',
+    'OTHER': 'Other',
+    'PRESTO': 'Presto',
+    'PROVIDED': 'Provided',
+    'QUALITY': 'Quality',
+    'ROMA': 'Roma',
+    'SMALL': 'Small',
+    'STANHOPE': 'Stanhope',
+    'STUDIO': 'Studio',
+    'TURNER': 'Turner',
+    'UFP': 'UFP',
+    'UPF': 'UFP',
+    'décor': 'Décor'}
+
+MAT = {
+    # '': 'Cameo Mat',
+    # '': 'Double Mat',
+    # '': 'Mat Float',
+    '4 Ply Book': '4 Ply Book',
+    '8 Ply Book': '8 Ply Book',
+    'CUSTOMER': 'Existing',
+    'Cold Mount': 'Cold Mount',
+    'Dry Mount': 'Dry Mount',
+    'Fabric Float': 'Fabric Float',
+    'Fabric Mat': 'Fabric Mat',
+    'Float': 'Float',
+    'n/a': numpy.nan}
+
+MATMFG = {
+    'Alpha': 'Alpha',
+    'Pongee Silk': 'Pongee',
+    'Rising': 'Rising',
+    'Shantung Silk': 'Shantung'}
+
+GLAZING = {
+    'CUSTOMER GLASS': 'Provided',
+    'CUSTOMER PLEXI': '',
+    'CUSTOMER': 'Provided',
+    'Cons Clear': 'Conservation Clear',
+    'Customer Plexi': 'Provided',
+    'Customer': 'Provided',
+    'Museum Glass': 'Museum Glass',
+    'NO GLAZING': numpy.nan,
+    'NONE': numpy.nan,
+    'None': numpy.nan,
+    'OP3 Plexi': 'OP3 Plexi',
+    'Optium Museum Plexi': 'Optium Museum Plexi',
+    'Provided': 'Provided',
+    'REG Plexi': 'Regular Plexi',
+    'Reg Glass': 'Regular Glass',
+    'Reg Plexi': 'Regular Plexi',
+    'n/a': numpy.nan,
+    'none': numpy.nan,
+    'prov': 'Provided',
+    'provided': 'Provided'}
+
+SALES_TYPE = {
+    'CONS': 'Conservation',
+    'HOLD': 'Hold',
+    'MATS': 'Mats',
+    'MET': 'Metal',
+    'OTH': 'Other',
+    'SPO': 'Special Order',
+    'VOID': 'Void',
+    'WHF': 'Hand-Finished',
+    'WPF': 'Pre-Finished'}
+
+
+def lookup(table, normalize=None):
+    """ Compile a mapping table into a vectorized Series lookup.
+
+        Values are factorized so normalization and lookup run once per
+        distinct value; unmapped or null values become NaN, like
+        ``mapping``.
+
+        Arguments:
+            table     (dict):      Mapping of normalized value to result
+            normalize (callable):  Vectorized Series normalizer (optional)
+
+        Returns:
+            Function mapping a Series to a Series of results.
+    """
+    def vectorized(series):
+        codes, uniques = pandas.factorize(series)
+        keys = pandas.Series(numpy.asarray(uniques, dtype=object))
+        if normalize is not None:
+            keys = normalize(keys)
+        values = keys.map(table).values.astype(object)
+        # Null codes (-1) take the trailing NaN
+        values = numpy.append(values, numpy.nan)
+        return pandas.Series(values[codes], index=series.index)
+    return vectorized
+
+
+def _normalize_category(series):
+    return series.str.strip()
+
+
+def _normalize_source(series):
+    return series.str.strip().str.strip('.').str.upper()
+
+
 def source(value):
-    return mapping(value.strip().strip('.').upper(), **{
-        'ART NE': 'Art New England',
-        'BAY WIN': 'BAY WIN',
-        'CN': 'CN',
-        'CO REF': 'CO REF',
-        'COUPON': 'Coupon',
-        'CR': 'CR',
-        'PC': 'PC',
-        'SMFA SALE': 'SMFA Sale',
-        'WBUR': 'WBUR',
-        'WEB': 'Web',
-        'WI': 'Walk In',
-        'WLK IN': 'Walk In',
-        'WLK': 'Walk In',
-        'YLW BK': 'Yellow Pages',
-        'YLW PG': 'Yellow Pages',
-        'YP': 'Yellow Pages'})
+    return mapping(value.strip().strip('.').upper(), **SOURCE)
 
 
 def delivery_location(value):
-    return mapping(value, **{'UPS': 'Delivery', 'PU BOS': 'Boston'})
+    return mapping(value, **DELIVERY_LOCATION)
 
 
 def discount(value):
-    return mapping(value, **{
-        'Artist': 'Artist',
-        'Dealer': 'Dealer',
-        'Donation': 'Donation',
-        'Employee': 'Employee',
-        'Institution': 'Institution',
-        'Other': 'Other',
-        'Poster Special': 'Poster',
-        'SMFA Art Sale': 'SMFA',
-        'Smfa Art Sale': 'SMFA',
-        'Verbal': 'Verbal',
-        'WBUR': 'WBUR',
-        'Wbur': 'WBUR',
-        'gallery': 'Gallery',
-        'special': 'Special'})
+    return mapping(value, **DISCOUNT)
 
 
 def order_location(value):
-    return mapping(value, BOS='Boston', SOM='Somerville')
+    return mapping(value, **ORDER_LOCATION)
 
 
 def salesperson(value):
@@ -130,109 +593,54 @@ def salesperson(value):
     return value
 
 
+def salespersons(series):
+    """ Vectorized ``salesperson``, run once per distinct value. """
+    codes, uniques = pandas.factorize(series)
+    values = [salesperson(x) for x in numpy.asarray(uniques, dtype=object)]
+    values = numpy.array(values + [salesperson(None)], dtype=object)
+    return pandas.Series(values[codes], index=series.index)
+
+
 def status(value):
-    return mapping(value, **{
-        'O': 'Open',
-        'C': 'Closed',
-        'A': 'Closed',
-        'X': 'Closed',
-        'V': 'Void'})
+    return mapping(value, **STATUS)
 
 
 def join(value):
-    return mapping(value, Nailed='Nailed', Splined='Splined')
+    return mapping(value, **JOIN)
 
 
 def framemfg(value):
-    return mapping(value, **{
-        # '': 'Don Mar',
-        # '': 'Frama',
-        'AMCI': 'AMCI',
-        'AMPF': 'AMPF',
-        'AOR': 'AOR',
-        'BAF/STANHOPE': 'Boston Art Framers,Stanhope',
-        'BOSTON ART FRAM': 'Boston Art Framers',
-        'Boston Art Fram': 'Boston Art Framers',
-        'CDNV': 'CDNV',
-        'CJ': 'CJ',
-        'CMI': 'CMI',
-        'DECOR': 'Décor',
-        'DÉCOR': 'Décor',
-        'FEINMAN': 'Feinman',
-        'LJ': 'LJ',
-        'MAX': 'MAX',
-        'NEW LOOK': 'New Look',
-        'NIELSEN': 'Nielsen',
-        'OEM': 'OEM',
-        'OMEGA': 'Omega',
-        'OTHER': 'Other',
-        'PRESTO': 'Presto',
-        'PROVIDED': 'Provided',
-        'QUALITY': 'Quality',
-        'ROMA': 'Roma',
-        'SMALL': 'Small',
-        'STANHOPE': 'Stanhope',
-        'STUDIO': 'Studio',
-        'TURNER': 'Turner',
-        'UFP': 'UFP',
-        'UPF': 'UFP',
-        'décor': 'Décor'})
+    return mapping(value, **FRAMEMFG)
 
 
 def mat(value):
-    return mapping(value, **{
-        # '': 'Cameo Mat',
-        # '': 'Double Mat',
-        # '': 'Mat Float',
-        '4 Ply Book': '4 Ply Book',
-        '8 Ply Book': '8 Ply Book',
-        'CUSTOMER': 'Existing',
-        'Cold Mount': 'Cold Mount',
-        'Dry Mount': 'Dry Mount',
-        'Fabric Float': 'Fabric Float',
-        'Fabric Mat': 'Fabric Mat',
-        'Float': 'Float',
-        'n/a': pandas.np.nan})
+    return mapping(value, **MAT)
 
 
 def matmfg(value):
-    return mapping(value, **{
-        'Alpha': 'Alpha',
-        'Pongee Silk': 'Pongee',
-        'Rising': 'Rising',
-        'Shantung Silk': 'Shantung'})
+    return mapping(value, **MATMFG)
 
 
 def glazing(value):
-    return mapping(value, **{
-        'CUSTOMER GLASS': 'Provided',
-        'CUSTOMER PLEXI': '',
-        'CUSTOMER': 'Provided',
-        'CUSTOMER': 'Provided',
-        'Cons Clear': 'Conservation Clear',
-        'Customer Plexi': 'Provided',
-        'Customer': 'Provided',
-        'Museum Glass': 'Museum Glass',
-        'NO GLAZING': pandas.np.nan,
-        'NONE': pandas.np.nan,
-        'None': pandas.np.nan,
-        'OP3 Plexi': 'OP3 Plexi',
-        'Optium Museum Plexi': 'Optium Museum Plexi',
-        'Provided': 'Provided',
-        'REG Plexi': 'Regular Plexi',
-        'Reg Glass': 'Regular Glass',
-        'Reg Plexi': 'Regular Plexi',
-        'n/a': pandas.np.nan,
-        'none': pandas.np.nan,
-        'prov': 'Provided',
-        'provided': 'Provided'})
+    return mapping(value, **GLAZING)
 
 
 def sales_type(value):
-    return mapping(value,
-                   CONS='Conservation', HOLD='Hold', MATS='Mats',
-                   MET='Metal', OTH='Other', SPO='Special Order',
-                   VOID='Void', WHF='Hand-Finished', WPF='Pre-Finished')
+    return mapping(value, **SALES_TYPE)
+
+
+account_categories = lookup(ACCOUNT_CATEGORY, _normalize_category)
+sources = lookup(SOURCE, _normalize_source)
+delivery_locations = lookup(DELIVERY_LOCATION)
+discounts = lookup(DISCOUNT)
+order_locations = lookup(ORDER_LOCATION)
+statuses = lookup(STATUS)
+joins = lookup(JOIN)
+framemfgs = lookup(FRAMEMFG)
+mats = lookup(MAT)
+matmfgs = lookup(MATMFG)
+glazings = lookup(GLAZING)
+sales_types = lookup(SALES_TYPE)
 
 
 def dimen(value):
@@ -265,5 +673,122 @@ def fraction(value):
         return pandas.np.nan
 
 
+DIMENSION = (
+    # Anything fractions.Fraction parses without an exponent...
+    r'^\s*(?P<sign>[-+]?)(?=[0-9]|\.[0-9])(?P<num>[0-9]*)'
+    r'(?:/(?P<den>[0-9]+)|(?:\.(?P<dec>[0-9]*))?)\s*$'
+    # ...or a whole number and a fraction, e.g. '16 3/4' or '8.1/2'
+    r'|^(?P<whole>[-+]?[0-9]+)[. ]'
+    r'(?P<fsign>[-+]?)(?P<fnum>[0-9]+)/(?P<fden>[0-9]+)$')
+FRACTIONS = [2, 4, 8, 16]
+
+
+def dimensions(series):
+    """ Vectorized equivalent of applying ``inches`` and ``fraction``.
+
+        Each value is parsed once with a single regex extraction per column
+        and reduced to a numerator/denominator with integer arithmetic.
+        Values the fast path cannot parse exactly fall back to ``dimen``.
+
+        Arguments:
+            series (Series):  Dimension strings, e.g. '16 3/4'
+
+        Returns:
+            DataFrame with 'Inches' and 'Fraction' columns.
+    """
+    size = len(series)
+    num = numpy.zeros(size, dtype='int64')
+    den = numpy.ones(size, dtype='int64')
+    fast = numpy.zeros(size, dtype=bool)
+    null = series.isnull().values
+    if series.dtype.kind in 'iuf':
+        _numeric_dimensions(series.values, num, den, fast)
+    elif size:
+        _string_dimensions(series, num, den, fast)
+
+    # Reduce fractions and split into whole inches and remainder
+    gcd = _gcd(num, den)
+    gcd[gcd == 0] = 1
+    num, den = num // gcd, den // gcd
+    valid = fast & (den > 0)
+    den[~valid] = 1
+    whole = numpy.sign(num) * (numpy.abs(num) // den)
+    rem = num - whole * den
+    inch = numpy.where(valid, whole, numpy.nan).astype(float)
+    frac = numpy.full(size, numpy.nan, dtype=object)
+    hasfrac = valid & numpy.in1d(den, FRACTIONS) & (rem != 0)
+    if hasfrac.any():
+        rems = pandas.Series(rem[hasfrac]).astype(str)
+        dens = pandas.Series(den[hasfrac]).astype(str)
+        frac[hasfrac] = ('.' + rems + '/' + dens).values
+
+    # Fall back to scalar parsing for anything else
+    inch = inch.astype(object)
+    for idx in (~fast & ~null).nonzero()[0]:
+        value = series.iat[idx]
+        inch[idx] = inches(value)
+        frac[idx] = fraction(value)
+    inch = pandas.Series(inch, index=series.index)
+    inch = inch.astype(int) if size and inch.notnull().all() \
+        else inch.astype(float)
+    frac = pandas.Series(frac, index=series.index)
+    return pandas.DataFrame({'Inches': inch, 'Fraction': frac},
+                            columns=['Inches', 'Fraction'])
+
+
+def _numeric_dimensions(values, num, den, fast):
+    values = values.astype(float)
+    fast[:] = numpy.isfinite(values) & (numpy.abs(values) < 2 ** 48)
+    scaled = values * 16
+    exact = fast & (scaled == numpy.floor(scaled))
+    num[fast] = numpy.trunc(values[fast])
+    num[exact] = scaled[exact]
+    den[exact] = 16
+
+
+def _string_dimensions(series, num, den, fast):
+    try:
+        parts = series.astype(object).str.extract(DIMENSION, expand=True)
+    except AttributeError:
+        # No string values to parse
+        return
+    digits = parts[['num', 'den', 'dec', 'whole', 'fnum', 'fden']]\
+        .fillna('').apply(lambda x: x.str.len()).sum(axis=1).values
+    matched = (parts['num'].notnull() | parts['whole'].notnull()).values
+    fast[:] = matched & (digits <= 15)
+    parts = parts[fast]
+    idx = fast.nonzero()[0]
+
+    def ints(col):
+        return pandas.to_numeric(
+            parts[col].replace('', '0').fillna('0')).values.astype('int64')
+
+    sign = numpy.where(parts['sign'] == '-', -1, 1)
+    fsign = numpy.where(parts['fsign'] == '-', -1, 1)
+    mixed = parts['whole'].notnull().values
+    ratio = parts['den'].notnull().values
+    places = parts['dec'].fillna('').str.len().values
+    scale = 10 ** places.astype('int64')
+    num[idx] = numpy.where(
+        mixed, ints('whole') * ints('fden') + fsign * ints('fnum'),
+        numpy.where(ratio, sign * ints('num'),
+                    sign * (ints('num') * scale + ints('dec'))))
+    den[idx] = numpy.where(mixed, ints('fden'),
+                           numpy.where(ratio, ints('den'), scale))
+
+
+def _gcd(a, b):
+    a, b = numpy.abs(a), numpy.abs(b)
+    while b.any():
+        nonzero = b != 0
+        a[nonzero], b[nonzero] = b[nonzero], a[nonzero] % b[nonzero]
+    return a
+
+
 def boolean(value):
     return value == '1'
+
+
+def booleans(series):
+    """ Vectorized ``boolean``; nulls are False. """
+    return pandas.Series((series == '1').values, index=series.index)
@@ -0,0 +1,237 @@
+"""
+CSV Writer
+
+Writes migration outputs concurrently, optionally split into row- or
+size-bounded shards and compressed. Outputs too large for memory are
+streamed from consecutive frames of their rows.
+"""
+import bz2
+import concurrent.futures
+import gzip
+import itertools
+import lzma
+import os
+
+import pandas
+from stanhope import utils
+
+BLOCKSIZE = 1000
+COMPRESSION = {'bz2': (bz2.open, '.bz2'),
+               'gzip': (gzip.open, '.gz'),
+               'xz': (lzma.open, '.xz')}
+DATE_FORMAT = '%m/%d/%Y %H:%M:%S'
+
+
+class CSVWriter(object):
+    def __init__(self, directory='/data', max_rows=None, max_bytes=None,
+                 compression=None, workers=4, executor='thread'):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.workers = workers
+        self.executor = executor
+
+    @property
+    def sharded(self):
+        return bool(self.max_rows or self.max_bytes)
+
+    def path(self, name, shard=None):
+        """ Output path of name, or of one of its shards. """
+        if shard is not None:
+            name = '{}-{:03d}'.format(name, shard + 1)
+        suffix = COMPRESSION[self.compression][1] if self.compression else ''
+        return os.path.join(self.directory, '{}.csv{}'.format(name, suffix))
+
+    def pool(self):
+        if self.executor == 'process':
+            return concurrent.futures.ProcessPoolExecutor(self.workers)
+        return concurrent.futures.ThreadPoolExecutor(self.workers)
+
+    @property
+    def blocksize(self):
+        return min(self.max_rows or BLOCKSIZE, BLOCKSIZE)
+
+    def write(self, outputs):
+        """ Write outputs.
+
+            Arguments:
+                outputs (dict):  Output name to DataFrame, or to an iterable
+                                 of DataFrames of consecutive rows
+
+            Returns:
+                List of paths written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        frames = [(name, preformat(frame)) for name, frame in outputs.items()
+                  if isinstance(frame, pandas.DataFrame)]
+        streams = [(name, frames) for name, frames in outputs.items()
+                   if not isinstance(frames, pandas.DataFrame)]
+        with self.pool() as pool:
+            if self.max_bytes:
+                jobs = [job for name, frame in frames
+                        for job in self.pack(name, frame, pool)]
+            elif self.max_rows:
+                jobs = [(self.path(name, idx), frame.iloc[start:stop])
+                        for name, frame in frames
+                        for idx, (start, stop) in enumerate(
+                            _bounds(len(frame), self.max_rows))]
+            else:
+                jobs = [(self.path(name), frame) for name, frame in frames]
+            futures = [pool.submit(_write, path, data, self.compression)
+                       for path, data in jobs]
+            for future in futures:
+                future.result()
+        paths = [path for path, _ in jobs]
+        for name, frames in streams:
+            paths.extend(self.stream(name, frames))
+        return paths
+
+    def stream(self, name, frames):
+        """ Write an output from consecutive frames of its rows.
+
+            Only a frame and a block of rows are held at a time. Files are
+            identical to writing the frames concatenated.
+
+            Arguments:
+                name   (str):       Output name
+                frames (iterable):  DataFrames of consecutive rows, at least
+                                    one
+
+            Returns:
+                List of paths written.
+        """
+        frames = (preformat(frame) for frame in frames)
+        first = next(frames)
+        frames = itertools.chain([first], frames)
+        if self.max_bytes:
+            header = render(first.iloc[:0], header=True)
+            blocks = _blocks(frames, self.blocksize)
+            shards = self.shards(name, header,
+                                 ((block, render(block)) for block in blocks))
+        elif self.max_rows:
+            shards = ((self.path(name, idx), block) for idx, block
+                      in enumerate(_blocks(frames, self.max_rows)))
+        else:
+            path = self.path(name)
+            opener = COMPRESSION[self.compression][0] \
+                if self.compression else open
+            with opener(path, 'wt', encoding='utf-8', newline='') as stream:
+                for idx, frame in enumerate(frames):
+                    frame.to_csv(stream, index=False, header=idx == 0)
+            return [path]
+        paths = []
+        for path, data in shards:
+            _write(path, data, self.compression)
+            paths.append(path)
+        return paths
+
+    def pack(self, name, frame, pool):
+        """ Render frame in blocks and pack them into size-bounded shards.
+
+            Sizes are measured before compression. A shard only exceeds
+            max_bytes when a single row does.
+        """
+        header = render(frame.iloc[:0], header=True)
+        blocks = [frame.iloc[start:stop]
+                  for start, stop in _bounds(len(frame), self.blocksize)]
+        return list(self.shards(name, header,
+                                zip(blocks, pool.map(render, blocks))))
+
+    def shards(self, name, header, rendered):
+        """ Pack rendered blocks into size-bounded shards.
+
+            Arguments:
+                name     (str):       Output name
+                header   (str):       Rendered CSV header
+                rendered (iterable):  (block, text) of consecutive blocks
+
+            Yields:
+                (path, text) of each shard, once it is full.
+        """
+        size = self.max_bytes - len(header.encode('utf-8'))
+        shard = [header]
+        idx = length = count = 0
+        for block, text in rendered:
+            for rows, piece, nbytes in _split(block, text, size):
+                full = self.max_rows and count + rows > self.max_rows
+                if len(shard) > 1 and (length + nbytes > size or full):
+                    yield self.path(name, idx), ''.join(shard)
+                    shard = [header]
+                    idx += 1
+                    length = count = 0
+                shard.append(piece)
+                length += nbytes
+                count += rows
+        yield self.path(name, idx), ''.join(shard)
+
+
+def preformat(frame, date_format=DATE_FORMAT):
+    """ Format datetime columns once per distinct value. """
+    dates = [x for x, dtype in frame.dtypes.items() if dtype.kind == 'M']
+    if not dates:
+        return frame
+    frame = frame.copy()
+    for col in dates:
+        frame[col] = utils.strftime(frame[col], date_format)
+    return frame
+
+
+def render(frame, header=False):
+    return frame.to_csv(None, index=False, header=header)
+
+
+def _bounds(length, size):
+    return [(start, min(start + size, length))
+            for start in range(0, length, size)] or [(0, 0)]
+
+
+def _blocks(frames, size):
+    """ Re-chunk consecutive frames into blocks of size rows, like _bounds.
+
+        Yields one empty block if the frames have no rows.
+    """
+    parts = []
+    rows = count = 0
+    empty = None
+    for frame in frames:
+        if empty is None:
+            empty = frame.iloc[:0]
+        start = 0
+        while start < len(frame):
+            stop = min(start + size - rows, len(frame))
+            parts.append(frame.iloc[start:stop])
+            rows += stop - start
+            start = stop
+            if rows == size:
+                yield _concat(parts)
+                parts = []
+                rows = 0
+                count += 1
+    if rows or not count:
+        yield _concat(parts) if parts else empty
+
+
+def _concat(parts):
+    return parts[0] if len(parts) == 1 else pandas.concat(parts)
+
+
+def _split(block, text, size):
+    """ Yield (rows, text, bytes) pieces of a rendered block under size. """
+    nbytes = len(text.encode('utf-8'))
+    if nbytes <= size or len(block) <= 1:
+        yield len(block), text, nbytes
+        return
+    half = len(block) // 2
+    for part in [block.iloc[:half], block.iloc[half:]]:
+        for piece in _split(part, render(part), size):
+            yield piece
+
+
+def _write(path, data, compression=None):
+    opener = COMPRESSION[compression][0] if compression else open
+    with opener(path, 'wt', encoding='utf-8', newline='') as stream:
+        if isinstance(data, pandas.DataFrame):
+            data.to_csv(stream, index=False)
+        else:
+            stream.write(data)
@@ -0,0 +1,53 @@
+import pandas
+from click.testing import CliRunner
+from stanhope import batch
+from stanhope.main import stanhope
+
+
+def test_paths(tmpdir):
+    for name in ['b.mdb', 'a.mdb', 'c.txt']:
+        tmpdir.join(name).write('')
+    pattern = str(tmpdir.join('*.mdb'))
+    assert batch.paths([pattern, str(tmpdir.join('a.mdb'))]) == \
+        [str(tmpdir.join('a.mdb')), str(tmpdir.join('b.mdb'))]
+    assert batch.paths(['missing.mdb']) == ['missing.mdb']
+
+
+def test_directories():
+    paths = ['/x/Store.mdb', '/y/Store.mdb', '/y/Other.mdb']
+    assert batch.directories('/out', paths) == \
+        ['/out/Store-1', '/out/Store-2', '/out/Other']
+
+
+def test_batch(tmpdir, synthetic_tables):
+    for name, rows in [('A', 100), ('B', 200)]:
+        synthetic_tables(rows, name)
+        tmpdir.join('{}.mdb'.format(name)).write('')
+    output = tmpdir.join('out')
+    result = CliRunner().invoke(stanhope, [
+        '-o', '-c', '-a', '--no-cache', '-O', str(output),
+        '--mdb', str(tmpdir.join('*.mdb')), '--pipelines', '2'])
+    assert result.exit_code == 0, result.output
+    report = pandas.read_csv(str(output.join('batch.csv')), index_col=0)
+    assert report['Orders'].tolist() == [100, 200]
+    assert report['Error'].isnull().all()
+    for name in ['A', 'B']:
+        assert output.join(name, 'Orders.csv').check()
+        assert output.join(name, batch.LOG).check()
+
+
+def test_batch_errors(tmpdir, synthetic_tables):
+    synthetic_tables(100, 'A')
+    tmpdir.join('A.mdb').write('')
+    output = tmpdir.join('out')
+    result = CliRunner().invoke(stanhope, [
+        '-o', '--no-cache', '-O', str(output),
+        '--mdb', str(tmpdir.join('A.mdb')),
+        '--mdb', str(tmpdir.join('Missing.mdb'))])
+    assert result.exit_code == 1, result.output
+    report = pandas.read_csv(str(output.join('batch.csv')), dtype=str)
+    # Counts of the failed file leave those of the others integers
+    counts = report[['Accounts', 'Contacts', 'Orders', 'Treatments']]
+    assert all(x.isdigit() for x in counts.iloc[0])
+    assert counts.iloc[1].isnull().all()
+    assert 'CalledProcessError' in report['Error'].tolist()[1]
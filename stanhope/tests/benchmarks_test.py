@@ -0,0 +1,39 @@
+from benchmarks import startup
+from benchmarks import suite
+from stanhope import tables
+
+
+def test_synthetic(synthetic_tables):
+    counts = synthetic_tables(400, chunksize=150)
+    for table, count in counts.items():
+        frame = tables.Table(table, chunksize=100).load()
+        assert len(frame) == count
+    assert frame['OrderDate'].notnull().any()
+
+
+def test_benchmarks(synthetic_tables):
+    synthetic_tables(200)
+    results = suite.benchmarks()
+    assert 'stage.export_treatments' in results
+    assert all(x >= 0 for x in results.values())
+
+
+def test_compare():
+    baseline = {'a': 1.0, 'b': 1.0, 'c': 0.01}
+    results = {'a': 1.1, 'b': 2.0, 'c': 0.02, 'd': 5.0}
+    regressions = suite.compare(results, baseline, 1.25, 0.05)
+    assert list(regressions) == ['b']
+
+
+def test_startup():
+    assert startup.heavy() == []
+    assert startup.timed(1) > 0
+
+
+def test_startup_parse():
+    stderr = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       120 |        150 |   click.types',
+        'import time:       300 |       2000 | click',
+        'import time:        50 |         50 | os'])
+    assert startup.parse(stderr) == [('click', 0.002), ('os', 0.00005)]
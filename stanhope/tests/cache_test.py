@@ -0,0 +1,97 @@
+import os
+import subprocess
+
+import pandas
+import pytest
+from stanhope import cache
+from stanhope import tables
+
+
+@pytest.fixture
+def export_cache(mdb):
+    path = mdb.join('StanhopeFramers.mdb')
+    path.write('mdb')
+    return cache.ExportCache(str(mdb.join('cache')), path=str(path))
+
+
+def test_export_cache(mdb, export_cache):
+    expected = tables.Customers().load()
+    customers = tables.Customers(cache=export_cache)
+    pandas.testing.assert_frame_equal(customers.load(), expected)
+    assert len(export_cache.entries()) == 1
+
+    # Cache hit never runs mdb-export
+    mdb.join('Customers.csv').remove()
+    pandas.testing.assert_frame_equal(customers.load(), expected)
+
+
+def test_export_cache_chunksize(mdb, export_cache):
+    customers = tables.Customers(chunksize=1, cache=export_cache)
+    first = customers.load()
+    second = customers.load()
+    pandas.testing.assert_frame_equal(first, second)
+
+
+def test_export_cache_invalidate(mdb, export_cache):
+    key = export_cache.key('Customers')
+    mdb.join('StanhopeFramers.mdb').write('changed')
+    assert export_cache.key('Customers') != key
+    assert export_cache.key('Customers') != export_cache.key('Other')
+
+
+def test_export_cache_error(mdb, export_cache):
+    with pytest.raises(subprocess.CalledProcessError):
+        tables.Customers('Missing', cache=export_cache).load()
+    assert export_cache.entries() == []
+    assert os.listdir(export_cache.directory) == []
+
+
+def test_export_cache_evict(mdb, export_cache):
+    tables.Customers(cache=export_cache).load()
+    tables.FrameOrders('FrameOrders-Working', cache=export_cache).load()
+    (_, first), (size, second) = export_cache.entries()
+    export_cache.maxsize = size
+    export_cache.evict()
+    assert export_cache.entries() == [(size, second)]
+    export_cache.maxsize = 0
+    export_cache.evict()
+    assert export_cache.entries() == []
+
+
+def test_export_cache_clear(mdb, export_cache):
+    tables.Customers(cache=export_cache).load()
+    export_cache.clear()
+    assert export_cache.entries() == []
+
+
+def test_export_cache_evicted(mdb, monkeypatch, export_cache):
+    tables.Customers(cache=export_cache).load()
+    tables.FrameOrders('FrameOrders-Working', cache=export_cache).load()
+    (_, first), (size, second) = export_cache.entries()
+    stat = os.stat
+
+    # Another process evicts first between listing and stat
+    def evicting(path, *args, **kwargs):
+        if path == first:
+            os.remove(first)
+        return stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'stat', evicting)
+    assert export_cache.entries() == [(size, second)]
+
+
+def test_export_cache_evicted_hit(mdb, monkeypatch, export_cache):
+    expected = tables.Customers(cache=export_cache).load()
+    (_, path), = export_cache.entries()
+    opened = open
+
+    # Another process evicts the entry just after it is opened
+    def evicting(name, *args, **kwargs):
+        stream = opened(name, *args, **kwargs)
+        if name == path:
+            os.remove(path)
+        return stream
+
+    monkeypatch.setattr(cache, 'open', evicting, raising=False)
+    returned = tables.Customers(cache=export_cache).load()
+    pandas.testing.assert_frame_equal(returned, expected)
@@ -0,0 +1,54 @@
+import os
+import stat
+
+import pytest
+from benchmarks import suite
+from benchmarks import synthetic
+
+CUSTOMERS = '''"Customer Number","Name","Credit","Tax Exempt","Deceased",\
+"Date","Last Order","Last Update","Category","Source","Comment"
+"smith ","Bob Smith",1,0,0,"01/02/17 00:00:00",,,"Retail","WEB",
+"jones","Ann\nJones",0,1,0,"03/04/16 00:00:00",,,"Artist",,"hi"
+"lee","Lee",0,0,1,,,,,"YP",
+'''
+
+FRAMEORDERS = '''"CustomerNo","OrderNo","OrderDate","DueDate","DateCompleted",\
+"Frame Width","Frame Height","Status","SalesType"
+"smith","{table}-1","01/02/17 00:00:00",,,"16 3/4","20","O","WHF"
+"jones","{table}-2","03/04/16 00:00:00",,,"8.1/2","10 1/3","C","VOID"
+"nobody","{table}-3","05/06/15 00:00:00",,,,"x","A","CONS"
+'''
+
+
+@pytest.fixture
+def mdb(tmpdir, monkeypatch):
+    """ Fake mdb-export serving CSVs from a temporary directory. """
+    tmpdir.join('Customers.csv').write(CUSTOMERS)
+    for table in ['FrameOrders-Working',
+                  'FrameOrders-Closed',
+                  'FrameOrders-Archive']:
+        tmpdir.join(table + '.csv').write(FRAMEORDERS.format(table=table))
+    script = tmpdir.join('mdb-export')
+    script.write('#!/bin/sh\nexec cat "{}/$2.csv"\n'.format(tmpdir))
+    script.chmod(script.stat().mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', '{}{}{}'.format(
+        tmpdir, os.pathsep, os.environ['PATH']))
+    return tmpdir
+
+
+@pytest.fixture
+def synthetic_tables(tmpdir, monkeypatch):
+    """ Serve synthetic tables from tmpdir/data through the fake mdb-export.
+
+        Returns a function generating tables of N rows into tmpdir/data, or
+        into tmpdir/data/NAME for NAME.mdb, and returning their row counts.
+    """
+    data = tmpdir.mkdir('data')
+    monkeypatch.setenv('STANHOPE_SYNTHETIC', str(data))
+    monkeypatch.setenv('PATH', '{}{}{}'.format(
+        suite.BIN, os.pathsep, os.environ['PATH']))
+
+    def generate(rows, name=None, **kwargs):
+        directory = data.join(name) if name else data
+        return synthetic.generate(str(directory), rows, **kwargs)
+    return generate
@@ -0,0 +1,165 @@
+import http.server
+import json
+import socketserver
+import threading
+import time
+
+import pandas
+import pytest
+from click.testing import CliRunner
+from stanhope import knack
+from stanhope.main import stanhope
+
+FIELDS = [{'key': 'field_1', 'label': 'Account'},
+          {'key': 'field_2', 'label': 'Legacy ID'}]
+
+
+class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body, **headers):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.reply(200, {'fields': FIELDS})
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with stub.lock:
+            stub.clients.add(self.client_address)
+            stub.requests += 1
+            fail = stub.fail.get(stub.requests)
+            slow = stub.slow.get(stub.requests)
+        if fail:
+            return self.reply(fail, {'errors': ['nope']}, **{'Retry-After': 0})
+        with stub.lock:
+            stub.records.append(json.loads(body.decode('utf-8')))
+        if slow:
+            time.sleep(slow)
+        self.reply(200, {'id': str(len(stub.records))})
+
+
+class Stub(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = set()
+        self.records = []
+        self.requests = 0
+        self.fail = {}
+        self.slow = {}
+
+
+@pytest.fixture
+def stub():
+    server = Server(('127.0.0.1', 0), Handler)
+    server.stub = Stub()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    server.stub.url = 'http://127.0.0.1:{}/v1'.format(server.server_port)
+    yield server.stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def csv(tmpdir):
+    frame = pandas.DataFrame({
+        'Account': ['Acct {}'.format(x) for x in range(25)],
+        'Legacy ID': ['id{}'.format(x) for x in range(25)],
+        'Comments': 'unmapped'}, columns=['Account', 'Legacy ID', 'Comments'])
+    frame.loc[3, 'Account'] = None
+    frame.to_csv(str(tmpdir.join('Accounts.csv')), index=False)
+    return tmpdir
+
+
+def uploader(stub, tmpdir, workers=4, timeout=60):
+    client = knack.Knack('app', 'key', stub.url, backoff=0, timeout=timeout)
+    checkpoint = knack.Checkpoint(str(tmpdir.join('.upload.json')))
+    return knack.Uploader(client, checkpoint, batch_size=4, workers=workers)
+
+
+def test_upload(stub, csv):
+    paths = knack.paths(str(csv), 'Accounts')
+    stats = uploader(stub, csv).upload('Accounts', 'object_1', paths)
+    assert stats['Records'] == 25
+    assert stats['Unmapped'] == 'Comments'
+    assert sorted(stub.records, key=lambda x: int(x['field_2'][2:]))[2:4] == \
+        [{'field_1': 'Acct 2', 'field_2': 'id2'}, {'field_2': 'id3'}]
+    assert len(stub.clients) <= 4
+
+
+def test_upload_retry(stub, csv):
+    stub.fail = {1: 429, 2: 429}
+    paths = knack.paths(str(csv), 'Accounts')
+    stats = uploader(stub, csv).upload('Accounts', 'object_1', paths)
+    assert stats['Records'] == 25
+    assert len(stub.records) == 25
+
+
+@pytest.mark.parametrize('fail,slow,error', [
+    ({1: 503}, {}, knack.KnackError),
+    ({}, {1: 0.5}, OSError)])
+def test_upload_no_retry(stub, csv, fail, slow, error):
+    # Creates may have been committed, so are not repeated
+    stub.fail = fail
+    stub.slow = slow
+    paths = knack.paths(str(csv), 'Accounts')
+    with pytest.raises(error):
+        uploader(stub, csv, workers=1, timeout=0.2).upload(
+            'Accounts', 'object_1', paths)
+    assert stub.requests == 1
+
+
+def test_paths(tmpdir):
+    for name in ['Accounts.csv', 'Accounts-002.csv', 'Accounts-001.csv',
+                 'Accounts-Delta.csv']:
+        tmpdir.join(name).write('')
+    assert knack.paths(str(tmpdir), 'Accounts') == \
+        [str(tmpdir.join('Accounts-001.csv')),
+         str(tmpdir.join('Accounts-002.csv'))]
+    assert knack.paths(str(tmpdir), 'Accounts-Delta') == \
+        [str(tmpdir.join('Accounts-Delta.csv'))]
+
+
+def test_upload_resume(stub, csv):
+    stub.fail = {10: 400}
+    paths = knack.paths(str(csv), 'Accounts')
+    with pytest.raises(knack.KnackError):
+        uploader(stub, csv, workers=1).upload('Accounts', 'object_1', paths)
+    assert len(stub.records) == 9
+
+    stats = uploader(stub, csv).upload('Accounts', 'object_1', paths)
+    assert stats['Records'] == 16
+    assert stats['Skipped'] == 9
+    assert sorted(x['field_2'] for x in stub.records) == \
+        sorted('id{}'.format(x) for x in range(25))
+
+    stats = uploader(stub, csv).upload('Accounts', 'object_1', paths)
+    assert stats['Records'] == 0
+
+
+def test_upload_command(stub, csv):
+    args = ['upload', '--app-id', 'app', '--api-key', 'key',
+            '--knack-url', stub.url, '-O', str(csv),
+            '--object', 'Accounts=object_1']
+    result = CliRunner().invoke(stanhope, args)
+    assert result.exit_code == 0, result.output
+    assert 'Accounts: 25 records' in result.output
+    assert csv.join('.upload.json').check()
+    result = CliRunner().invoke(stanhope, args[:-1] + ['Contacts=object_2'])
+    assert 'No CSVs of Contacts' in result.output
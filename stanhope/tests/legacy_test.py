@@ -0,0 +1,39 @@
+import collections
+
+import pandas
+from stanhope import legacy
+
+FRAME = pandas.DataFrame({
+    'Account': ['Alice', 'Bob', 'Bob', 'Carol'],
+    'Legacy ID': ['a1', 'b2', 'b2', 'c3'],
+    'Legacy Record': ['<pre>\nA\n</pre>', '<pre>\nB/b\n</pre>',
+                      '<pre>\nB/b\n</pre>', None]},
+    columns=['Account', 'Legacy ID', 'Legacy Record'])
+
+
+def read(store, name):
+    return pandas.read_json(store.path(name), lines=True, dtype=False)
+
+
+def test_split(tmpdir):
+    store = legacy.LegacyStore(str(tmpdir))
+    contacts = FRAME.drop('Legacy Record', axis=1)
+    outputs = store.split(collections.OrderedDict([
+        ('Accounts', FRAME), ('Contacts', contacts)]))
+    assert list(outputs['Accounts'].columns) == ['Account', 'Legacy ID']
+    assert outputs['Contacts'] is contacts
+    records = read(store, 'Accounts')
+    assert records['Legacy ID'].tolist() == ['a1', 'b2', 'c3']
+    assert records['Legacy Record'].tolist()[:2] == \
+        ['<pre>\nA\n</pre>', '<pre>\nB/b\n</pre>']
+    assert not tmpdir.join('Contacts-Legacy.jsonl.gz').check()
+
+
+def test_split_stream(tmpdir):
+    store = legacy.LegacyStore(str(tmpdir))
+    parts = [FRAME.iloc[:2], FRAME.iloc[2:], FRAME.iloc[:1]]
+    outputs = store.split({'Orders': iter(parts)})
+    frames = list(outputs['Orders'])
+    assert [len(x) for x in frames] == [2, 2, 1]
+    assert all('Legacy Record' not in x for x in frames)
+    assert read(store, 'Orders')['Legacy ID'].tolist() == ['a1', 'b2', 'c3']
@@ -0,0 +1,35 @@
+import pandas
+from stanhope import manifest
+
+
+def frame(**rows):
+    return pandas.DataFrame({'Legacy ID': list(rows),
+                             'Value': list(rows.values())})
+
+
+def test_index_duplicates():
+    first = manifest.index(pandas.DataFrame({'Legacy ID': ['a', 'a', 'b'],
+                                             'Value': [1, 2, 3]}))
+    second = manifest.index(pandas.DataFrame({'Legacy ID': ['a', 'a', 'b'],
+                                              'Value': [1, 9, 3]}))
+    assert sorted(first) == ['a', 'b']
+    assert first['a'] != second['a']
+    assert first['b'] == second['b']
+
+
+def test_delta():
+    before = frame(a=1, b=2, c=3)
+    after = frame(a=1, b=5, d=4)
+    previous = manifest.index(before)
+    current = manifest.index(after)
+    returned = manifest.delta(after, current, previous)
+    assert returned['Legacy ID'].tolist() == ['b', 'd']
+    assert manifest.deleted(current, previous) == ['c']
+
+
+def test_load_dump(tmpdir):
+    path = str(tmpdir.join('manifest.json'))
+    assert manifest.load(path) == {}
+    expected = {'Accounts': manifest.index(frame(a=1, b=2))}
+    manifest.dump(expected, path)
+    assert manifest.load(path) == expected
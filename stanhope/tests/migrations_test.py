@@ -0,0 +1,65 @@
+import pandas
+import pytest
+from benchmarks import synthetic
+from stanhope.migrations import StanhopeFramers
+from stanhope.writer import CSVWriter
+
+
+def test_join_records(mdb):
+    with StanhopeFramers('FrameOrders-Working', None, None) as migration:
+        migration.load_customers()
+        migration.load_frameorders()
+        migration.join_records(True)
+    assert migration.customers.frame['Customer Number'].tolist() == \
+        ['SMITH', 'JONES']
+    assert migration.frameorders.frame['CustomerNo'].tolist() == \
+        ['SMITH', 'JONES']
+    assert migration.orphans.to_dict('index') == {
+        'Orders without Account': {'Count': 1, 'Sample': 'NOBODY'},
+        'Accounts without Orders': {'Count': 1, 'Sample': 'LEE'}}
+    shards = migration.frameorders.columns['Shard Key']
+    assert shards.index.equals(migration.frameorders.frame.index)
+
+
+def test_refresh(tmpdir, synthetic_tables):
+    synthetic_tables(300)
+    writer = CSVWriter(str(tmpdir.mkdir('out')))
+    with StanhopeFramers(*synthetic.FRAMEORDERS, writer=writer) as migration:
+        migration.customers.pages = {}
+        migration.frameorders.pages = {}
+        migration.load_customers()
+        migration.load_frameorders()
+        migration.join_records(True)
+        migration.export_orders()
+        migration.export_treatments()
+        migration.customers.changed()
+        migration.frameorders.changed()
+        assert migration.refresh(join=True) == []
+
+        path = str(tmpdir.join('data', 'Customers.csv'))
+        customers = pandas.read_csv(path, dtype=str)
+        synthetic.write([customers.iloc[:-1]], path)
+        orders = migration.frameorders.frame
+        assert migration.refresh() == ['Accounts', 'Contacts']
+        assert migration.frameorders.frame is orders
+        assert len(migration.accounts) == len(customers) - 1
+        assert sorted(x.basename for x in tmpdir.join('out').listdir()) == \
+            ['Accounts.csv', 'Contacts.csv']
+
+
+@pytest.mark.parametrize('epoch,join', [(None, False), ('2010-01-01', True)])
+def test_max_memory(tmpdir, synthetic_tables, epoch, join):
+    synthetic_tables(600)
+    outputs = []
+    for name, max_memory in [('whole', None), ('parts', 2 ** 16)]:
+        writer = CSVWriter(str(tmpdir.mkdir(name)))
+        with StanhopeFramers(*synthetic.FRAMEORDERS, writer=writer,
+                             epoch=epoch, max_memory=max_memory) as mdb:
+            mdb.schedule(epoch, join).run()
+            outputs.append(mdb.orphans)
+        if max_memory:
+            assert len(mdb.partitions.paths) > 3
+            assert mdb.spills is None
+    assert outputs[0].equals(outputs[1])
+    for path in tmpdir.join('whole').listdir():
+        assert path.read() == tmpdir.join('parts', path.basename).read()
@@ -0,0 +1,77 @@
+import json
+import re
+import threading
+import time
+
+import pandas
+from stanhope import profiling
+from stanhope.scheduler import Scheduler
+
+
+class Migration(object):
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.frame = pandas.DataFrame({'a': [1, 2, 3]})
+        self.result = None
+
+    @profiling.stage('double', inputs=['frame'], outputs=['result'])
+    def double(self):
+        self.result = pandas.concat([self.frame, self.frame])
+        return self.result
+
+    @profiling.stage('wait', inputs=lambda self, attr, event: [attr])
+    def wait(self, attr, event):
+        event.wait(5)
+
+
+def test_stage_unprofiled():
+    assert len(Migration().double()) == 6
+
+
+def test_stage_profiled(tmpdir):
+    profiler = profiling.Profiler(str(tmpdir.join('prof')))
+    assert len(Migration(profiler).double()) == 6
+    profiler.stop()
+    stage, = profiler.stages
+    assert stage['stage'] == 'double'
+    assert (stage['rows_in'], stage['rows_out']) == (3, 6)
+    assert stage['wall'] >= 0 and stage['peak_traced'] > 0
+    assert tmpdir.join('prof', 'double.prof').check()
+
+    path = tmpdir.join('profile.json')
+    profiler.dump(str(path))
+    assert json.loads(path.read())['stages'][0]['rows_out'] == 6
+    profiler.report()
+
+
+def test_stage_tasks(tmpdir):
+    profiler = profiling.Profiler(str(tmpdir.join('prof')), memory=False)
+    migration = Migration(profiler)
+    migration.result = pandas.DataFrame({'a': range(5)})
+    done = threading.Event()
+    done.set()
+    scheduler = Scheduler()
+    scheduler.add('wait_frame', migration.wait, 'frame', done)
+    scheduler.add('wait_result', migration.wait, 'result', done)
+    scheduler.run()
+    assert [(x['stage'], x['rows_in']) for x in profiler.stages] == \
+        [('wait_frame', 3), ('wait_result', 5)]
+    assert tmpdir.join('prof', 'wait_frame.prof').check()
+    assert tmpdir.join('prof', 'wait_result.prof').check()
+
+
+def test_stage_concurrent(capsys):
+    migration = Migration()
+    done = threading.Event()
+    done.set()
+    release = threading.Event()
+    slow = threading.Thread(target=migration.wait, args=('frame', release))
+    slow.start()
+    time.sleep(0.2)
+    migration.wait('frame', done)
+    release.set()
+    slow.join()
+    deltas = re.findall(r'-- wait -> ([0-9.]+)s', capsys.readouterr().out)
+    assert len(deltas) == 2
+    # Each call is timed from its own start
+    assert max(float(x) for x in deltas) >= 0.2
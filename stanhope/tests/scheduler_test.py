@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+from stanhope.scheduler import Scheduler
+
+
+def test_run_order():
+    calls = []
+    scheduler = Scheduler()
+    for name in ['a', 'b', 'c']:
+        scheduler.add(name, calls.append, name)
+    scheduler.add('d', calls.append, 'd', after=['a'])
+    scheduler.run()
+    assert calls == ['a', 'b', 'c', 'd']
+
+
+def test_run_dependencies():
+    events = {}
+    barrier = threading.Barrier(2, timeout=5)
+
+    def task(name, wait=False):
+        if wait:
+            barrier.wait()
+        events[name] = time.perf_counter()
+        return name
+
+    scheduler = Scheduler(4)
+    scheduler.add('left', task, 'left', True)
+    scheduler.add('right', task, 'right', True)
+    scheduler.add('join', task, 'join', after=['left', 'right'])
+    results = scheduler.run()
+    assert list(results)[-1] == 'join'
+    assert events['join'] >= max(events['left'], events['right'])
+
+
+def test_run_error():
+    calls = []
+
+    def fail():
+        raise KeyError('nope')
+
+    scheduler = Scheduler(2)
+    scheduler.add('fail', fail)
+    scheduler.add('after', calls.append, 'after', after=['fail'])
+    with pytest.raises(KeyError):
+        scheduler.run()
+    assert calls == []
+
+
+def test_add_unknown():
+    with pytest.raises(ValueError):
+        Scheduler().add('a', print, after=['b'])
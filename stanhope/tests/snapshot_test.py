@@ -0,0 +1,76 @@
+import pandas
+import pytest
+from stanhope import snapshot
+from stanhope import tables
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def snapshots(mdb):
+    path = mdb.join('StanhopeFramers.mdb')
+    path.write('mdb')
+    return snapshot.Snapshots(str(mdb.join('snapshots')), path=str(path))
+
+
+@pytest.mark.parametrize('table', [
+    tables.Customers(),
+    tables.FrameOrders('FrameOrders-Working', 'FrameOrders-Closed')])
+def test_snapshot(snapshots, table):
+    assert snapshots.load(table) is None
+    expected = table.load()
+    snapshots.save(table)
+    returned = snapshots.load(table)
+    pandas.testing.assert_frame_equal(returned, expected)
+
+
+def test_snapshot_invalidate(mdb, snapshots):
+    table = tables.Customers()
+    table.load()
+    snapshots.save(table)
+    mdb.join('StanhopeFramers.mdb').write('changed')
+    assert snapshots.load(table) is None
+    assert snapshots.load(tables.Customers(tag=True)) is None
+
+
+def test_snapshot_schema(snapshots):
+    table = tables.Customers()
+    table.load()
+    snapshots.save(table)
+    _, meta = snapshots.filenames(table)
+    with open(meta, 'w') as stream:
+        stream.write('{"columns": [], "dtypes": []}')
+    assert snapshots.load(table) is None
+
+
+def test_snapshot_mixed(snapshots):
+    table = tables.Customers()
+    table.load()
+    table.frame['Zip'] = pandas.Series([2134, '02134-1234', None],
+                                       dtype=object)
+    with pytest.warns(UserWarning):
+        assert snapshots.save(table) is False
+    assert snapshots.load(table) is None
+
+
+def test_snapshot_key(snapshots):
+    table = tables.Customers()
+    table.load()
+    snapshots.save(table)
+    assert snapshots.load(tables.Customers(chunksize=1)) is None
+
+
+def test_snapshot_conforms(monkeypatch, snapshots):
+    table = tables.Customers()
+    table.load()
+    snapshots.save(table)
+    schema = tables.Customers.SCHEMA.copy()
+    schema['Source'] = str
+    monkeypatch.setattr(tables.Customers, 'SCHEMA', schema)
+    # Same key, so only the SCHEMA check rejects it
+    monkeypatch.setattr(snapshots, 'key', lambda x: 'customers')
+    snapshots.save(table)
+    schema['Source'] = 'category'
+    assert snapshots.load(table) is not None
+    schema['Source'] = str
+    assert snapshots.load(table) is None
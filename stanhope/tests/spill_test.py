@@ -0,0 +1,44 @@
+import numpy
+import pandas
+from stanhope import spill
+from stanhope import tables
+
+
+def frames():
+    return [
+        pandas.DataFrame({'Qty': [1, 2], 'Zip': [2138, 2139],
+                          'Status': pandas.Categorical(['O', 'C'])}),
+        pandas.DataFrame({'Qty': [numpy.nan, 3.0], 'Zip': ['02140', None],
+                          'Status': pandas.Categorical(['V', None])}),
+        pandas.DataFrame({'Qty': [numpy.nan], 'Zip': [None],
+                          'Status': pandas.Categorical([None], ['C'])})]
+
+
+def test_spill(tmpdir):
+    parts = spill.Spill(str(tmpdir), 'Orders', concat=tables.concat)
+    for frame in frames():
+        parts.append(frame)
+    assert len(parts) == 5
+    whole = tables.concat(frames())
+    returned = pandas.concat(list(parts))
+    pandas.testing.assert_frame_equal(returned, whole)
+    assert returned.to_csv() == whole.to_csv()
+
+
+def test_spill_max_bytes(tmpdir):
+    frame = pandas.DataFrame({'Name': ['x' * 100] * 1000})
+    parts = spill.Spill(str(tmpdir), 'Names', max_bytes=20000)
+    parts.append(frame)
+    returned = list(parts)
+    assert len(returned) > 1
+    assert max(x.memory_usage(deep=True).sum() for x in returned) < 30000
+    pandas.testing.assert_frame_equal(pandas.concat(returned), frame)
+
+
+def test_spill_empty(tmpdir):
+    parts = spill.Spill(str(tmpdir), 'Orders')
+    parts.append(frames()[0].iloc[:0])
+    returned = list(parts)
+    assert len(parts) == 0
+    assert len(returned) == 1
+    assert list(returned[0].dtypes) == list(frames()[0].dtypes)
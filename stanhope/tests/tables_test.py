@@ -0,0 +1,189 @@
+import concurrent.futures
+import subprocess
+import time
+
+import pandas
+import pytest
+from benchmarks import synthetic
+from stanhope import cache
+from stanhope import tables
+from stanhope import utils
+
+
+def test_load(mdb):
+    frameorders = tables.FrameOrders('FrameOrders-Working',
+                                     'FrameOrders-Closed')
+    frame = frameorders.load()
+    assert frame['OrderNo'].tolist() == [
+        'FRAMEORDERS-WORKING-1', 'FRAMEORDERS-WORKING-2',
+        'FRAMEORDERS-WORKING-3', 'FRAMEORDERS-CLOSED-1',
+        'FRAMEORDERS-CLOSED-2', 'FRAMEORDERS-CLOSED-3']
+    assert frame['OrderDate'].dtype.kind == 'M'
+
+
+def test_load_schema(mdb):
+    customers = tables.Customers()
+    with pytest.warns(UserWarning, match='schema drift'):
+        frame = customers.load()
+    assert frame['Customer Number'].tolist() == ['SMITH', 'JONES', 'LEE']
+    assert frame['Credit'].tolist() == [True, False, False]
+    assert frame['Deceased'].dtype == bool
+    assert frame['Source'].dtype == 'category'
+    assert frame['Date'].dtype.kind == 'M'
+
+
+def test_load_categories(mdb):
+    frameorders = tables.FrameOrders('FrameOrders-Working',
+                                     'FrameOrders-Closed',
+                                     chunksize=2)
+    frame = frameorders.load()
+    assert frame['Status'].dtype == 'category'
+    assert frame['SalesType'].tolist() == ['WHF', 'VOID', 'CONS'] * 2
+
+
+def test_load_chunksize(mdb):
+    expected = tables.Customers().load()
+    returned = tables.Customers(chunksize=1).load()
+    pandas.testing.assert_frame_equal(returned, expected)
+
+
+def test_iterload_chunksize(mdb):
+    customers = tables.Customers(chunksize=2)
+    assert [len(x) for x in customers.iterload('Customers')] == [2, 1]
+
+
+def test_export_chunksize(mdb):
+    chunks = utils.export('Customers', chunksize=2)
+    assert pandas.concat(chunks).equals(utils.export('Customers'))
+
+
+def test_mdb_export_error(mdb):
+    with pytest.raises(subprocess.CalledProcessError):
+        tables.Customers('Missing').load()
+
+
+def test_load_tag(mdb):
+    frameorders = tables.FrameOrders('FrameOrders-Working',
+                                     'FrameOrders-Archive',
+                                     tag=True)
+    frame = frameorders.load()
+    expected = ['FrameOrders-Working'] * 3 + ['FrameOrders-Archive'] * 3
+    assert frame['Table'].tolist() == expected
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_load_concurrent(mdb, cached):
+    mdb.join('mdb-export').write(
+        '#!/bin/sh\nsleep 0.5\nexec cat "{}/$2.csv"\n'.format(mdb))
+    mdb.join('StanhopeFramers.mdb').write('mdb')
+    export_cache = cache.ExportCache(
+        str(mdb.join('cache')), path=str(mdb.join('StanhopeFramers.mdb'))) \
+        if cached else None
+    frameorders = tables.FrameOrders('FrameOrders-Working',
+                                     'FrameOrders-Closed',
+                                     'FrameOrders-Archive',
+                                     cache=export_cache)
+    start = time.perf_counter()
+    frame = frameorders.load()
+    # Exports overlap, rather than taking 0.5s each
+    assert time.perf_counter() - start < 1.2
+    assert frame['OrderNo'].str.startswith('FRAMEORDERS-ARCHIVE').sum() == 3
+
+
+@pytest.mark.parametrize('workers', [None, 3])
+@pytest.mark.parametrize('method', ['orders', 'treatments'])
+def test_transform(synthetic_tables, method, workers):
+    synthetic_tables(600)
+    frameorders = tables.FrameOrders(*synthetic.FRAMEORDERS, workers=workers)
+    frameorders.load()
+    expected = getattr(frameorders, method)()
+    returned = frameorders.transform(method)
+    assert len(frameorders.shards(3)) == 3
+    assert returned.index.tolist() == expected.index.tolist()
+    assert returned.to_csv(None, index=False) == \
+        expected.to_csv(None, index=False)
+
+
+def test_derived(mdb):
+    customers = tables.Customers()
+    customers.load()
+    calls = []
+
+    def func(frame):
+        calls.append(len(frame))
+        return frame['Name'].str.upper()
+
+    assert customers.derived('Upper', func).tolist() == \
+        ['BOB SMITH', 'ANN\nJONES', 'LEE']
+    customers.derived('Upper', func)
+    assert calls == [3]
+    customers.frame = customers.frame.iloc[:1]
+    assert customers.derived('Upper', func).tolist() == ['BOB SMITH']
+    assert calls == [3, 1]
+
+
+def test_transform_columns(synthetic_tables):
+    synthetic_tables(200)
+    frameorders = tables.FrameOrders(*synthetic.FRAMEORDERS, workers=2)
+    frame = frameorders.load()
+    orders = frameorders.transform('orders')
+    expected = utils.legacy_ids(frame[frameorders.LEGACY_ID])
+    assert frameorders.columns['Legacy ID'].tolist() == expected.tolist()
+    assert orders['Legacy ID'].tolist() == expected.tolist()
+
+
+def test_transform_concurrent(synthetic_tables, monkeypatch):
+    synthetic_tables(200)
+    frameorders = tables.FrameOrders(*synthetic.FRAMEORDERS, workers=2)
+    frameorders.load()
+    pools = []
+    shipped = []
+
+    class Pool(concurrent.futures.ProcessPoolExecutor):
+        def __enter__(self):
+            pools.append(self)
+            assert len(pools) == 1
+            return super(Pool, self).__enter__()
+
+        def __exit__(self, *exc):
+            pools.remove(self)
+            return super(Pool, self).__exit__(*exc)
+
+        def map(self, func, jobs):
+            jobs = list(jobs)
+            shipped.append(sorted(jobs[0][3]))
+            return super(Pool, self).map(func, jobs)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', Pool)
+    with concurrent.futures.ThreadPoolExecutor(2) as threads:
+        results = list(threads.map(frameorders.transform,
+                                   ['orders', 'treatments']))
+    # The later transform reuses the Legacy IDs the earlier one derived
+    assert ['Legacy ID', 'Shard Key'] in shipped
+    assert results[1]['Legacy ID'].tolist() == \
+        results[0]['Legacy ID'].tolist()
+
+
+@pytest.mark.parametrize('op', ['<', '<=', '>', '>=', '==', '!='])
+@pytest.mark.parametrize('dates', [
+    ['2001-01-01', '2002-01-01', '2002-01-01', '2003-01-01'],
+    ['2003-01-01', None, '2002-01-01', '2001-01-01']])
+def test_select(op, dates):
+    frame = pandas.DataFrame({'OrderDate': pandas.to_datetime(dates)},
+                             index=[3, 3, 1, 0])
+    returned = tables.select(frame, [('OrderDate', op, '2002')])
+    mask = tables.OPERATORS[op](frame['OrderDate'],
+                                pandas.Timestamp('2002'))
+    pandas.testing.assert_frame_equal(returned, frame.loc[mask.values])
+
+
+def test_load_filters(mdb):
+    frameorders = tables.FrameOrders('FrameOrders-Working',
+                                     'FrameOrders-Closed',
+                                     chunksize=1,
+                                     filters=[('OrderDate', '>=', '2016')])
+    frame = frameorders.load()
+    assert frame['OrderNo'].tolist() == [
+        'FRAMEORDERS-WORKING-1', 'FRAMEORDERS-WORKING-2',
+        'FRAMEORDERS-CLOSED-1', 'FRAMEORDERS-CLOSED-2']
+    assert frame['Status'].dtype == 'category'
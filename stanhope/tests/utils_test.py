@@ -1,2 +1,200 @@
+import numpy
+import pandas
+import pytest
+from stanhope import utils
+
+
 def test_no_op():
     pass
+
+
+@pytest.fixture
+def frame():
+    return pandas.DataFrame({
+        'CustomerNo': ['SMITH', 'O/NEIL', u'D\xc9COR', 'a"b\\c', u'\x0bX\n',
+                       u'\x7f', '', None],
+        'OrderNo': ['1', '2', '3', '4', '5', '6', '7', '8'],
+        'OrderDate': pandas.to_datetime([
+            '2017-01-01 12:34:56.789', None, '1960-01-01', '2001-02-03',
+            '2001-02-03', '2001-02-03', '2001-02-03', '2001-02-03'])})
+
+
+@pytest.mark.parametrize('columns', [
+    ['CustomerNo'],
+    ['CustomerNo', 'OrderNo', 'OrderDate'],
+    ['OrderDate']])
+def test_legacy_ids(frame, columns):
+    expected = frame[columns].apply(utils.legacy_id, axis=1)
+    returned = utils.legacy_ids(frame[columns])
+    pandas.testing.assert_series_equal(returned, expected)
+
+
+def test_legacy_ids_numeric():
+    frame = pandas.DataFrame({'i': [1, 2], 'f': [1.5, None], 't': [1, 0]})
+    frame['t'] = frame['t'].astype(bool)
+    for columns in [['i', 'f'], ['i', 't'], ['f']]:
+        expected = frame[columns].apply(utils.legacy_id, axis=1)
+        returned = utils.legacy_ids(frame[columns])
+        assert returned.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('dtype', ['category', 'string'])
+def test_legacy_ids_text(frame, dtype):
+    frame['CustomerNo'] = pandas.Series(
+        ['SMITH, BOB', 'a,b,,c', ',', None, 'X', 'X', 'Y', 'Z'], dtype=dtype)
+    frame['OrderNo'] = frame['OrderNo'].astype(dtype)
+    for columns in [['CustomerNo'], ['CustomerNo', 'OrderNo', 'OrderDate']]:
+        expected = frame[columns].apply(utils.legacy_id, axis=1)
+        returned = utils.legacy_ids(frame[columns])
+        assert returned.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_legacy_ids_workers(frame, executor):
+    expected = utils.legacy_ids(frame)
+    returned = utils.legacy_ids(frame, workers=3, executor=executor)
+    pandas.testing.assert_series_equal(returned, expected)
+
+
+def test_legacy_ids_empty():
+    assert utils.legacy_ids(pandas.DataFrame({'a': []})).empty
+
+
+def test_legacy_records():
+    frame = pandas.DataFrame({
+        'Customer Number': ['SMITH', 'JONES', None, 'LEE'],
+        'Name': ['Bob\nSmith', u'\xc9t\xe9\x0b', None, 'x' * 1200],
+        'LongerLabel': [12.5, None, None, -3.0],
+        'Date': pandas.to_datetime(['2017-01-01', None, None, '2001-02-03']),
+        'Tax Exempt': [True, False, None, True],
+        'Empty': ['', ' a ', None, 'a\tb\r']})
+    expected = frame.apply(utils.legacy_record, axis=1)
+    returned = utils.legacy_records(frame)
+    pandas.testing.assert_series_equal(returned, expected)
+
+
+def test_legacy_records_numeric():
+    frame = pandas.DataFrame({'i': [1, 2], 'f': [1.5, None]})
+    expected = frame.apply(utils.legacy_record, axis=1)
+    returned = utils.legacy_records(frame)
+    pandas.testing.assert_series_equal(returned, expected)
+
+
+@pytest.mark.parametrize('scalar,vectorized,values', [
+    (utils.account_category, utils.account_categories,
+     [' Artist ', 'Retail', 'Nope']),
+    (utils.source, utils.sources, ['wlk in.', ' YP ', 'web', 'nope']),
+    (utils.delivery_location, utils.delivery_locations, ['UPS', 'X']),
+    (utils.discount, utils.discounts, ['Wbur', 'wbur', 'special']),
+    (utils.order_location, utils.order_locations, ['BOS', 'SOM', 'bos']),
+    (utils.status, utils.statuses, ['O', 'A', 'V', 'Q']),
+    (utils.join, utils.joins, ['Nailed', 'Glued']),
+    (utils.framemfg, utils.framemfgs, ['UPF', u'D\xc9COR', 'Roma']),
+    (utils.mat, utils.mats, ['n/a', 'Float', 'CUSTOMER']),
+    (utils.matmfg, utils.matmfgs, ['Alpha', 'Beta']),
+    (utils.glazing, utils.glazings, ['NONE', 'CUSTOMER PLEXI', 'prov']),
+    (utils.sales_type, utils.sales_types, ['WHF', 'VOID', 'XXX'])])
+def test_lookup(scalar, vectorized, values):
+    series = pandas.Series(values * 2, index=range(10, 10 + len(values) * 2))
+    expected = series.apply(scalar)
+    returned = vectorized(series)
+    pandas.testing.assert_series_equal(returned, expected.astype(object))
+
+
+def test_lookup_null():
+    series = pandas.Series(['O', None, numpy.nan, 'C'])
+    assert utils.statuses(series).tolist()[::3] == ['Open', 'Closed']
+    assert utils.statuses(series).iloc[1:3].isnull().all()
+    assert utils.sources(series).isnull().all()
+
+
+def test_lookup_category():
+    series = pandas.Series(['O', None, 'V', 'O'])
+    pandas.testing.assert_series_equal(
+        utils.statuses(series.astype('category')), utils.statuses(series))
+
+
+@pytest.mark.parametrize('replace', [' ', '\n'])
+def test_replace_newlines(replace):
+    values = [None, numpy.nan, 12, 3.5, ' a\r\n\x0bb\x10c `', '`x`',
+              'one\n\r\ntwo', '', ' `plain` ']
+    frame = pandas.DataFrame({
+        'Text': values,
+        'Reversed': values[::-1],
+        'Category': pandas.Categorical(['x\n', None, 'y'] * 3)})
+    returned = utils.replace_newlines(frame, replace)
+    assert list(returned.columns) == list(frame.columns)
+    for col in frame.columns:
+        expected = frame[col].apply(
+            lambda x: utils.replace_newline(x, replace))
+        assert [None if pandas.isnull(x) else x for x in returned[col]] == \
+            [None if pandas.isnull(x) else x for x in expected]
+
+
+def test_uppers():
+    series = pandas.Series([' smith ', 'Ab', None, numpy.nan, ' '])
+    assert utils.uppers(series).tolist() == ['SMITH', 'AB', '', '', '']
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_booleans(dtype):
+    series = pandas.Series(['1', '0', None, '1'], dtype=dtype)
+    returned = utils.booleans(series)
+    assert returned.dtype == bool
+    assert returned.tolist() == [True, False, False, True]
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_salespersons(dtype):
+    series = pandas.Series(['SN', 'AB', '', None, 'AB'], dtype=dtype)
+    expected = pandas.Series(['SB', 'AB', 'RS', 'RS', 'AB'], dtype=object)
+    pandas.testing.assert_series_equal(utils.salespersons(series), expected)
+
+
+DIMENSIONS = [
+    '16 3/4', '20', '8.1/2', '10 1/3', '', '12 5/16', '7/8', 'x', '3 0/4',
+    '11.25', '9 2/4', ' 4 1/2 ', '4 1/2 ', '  12  ', '-3 1/2', '+3 -1/2',
+    '3/0', '3 1/0', '.5', '5.', '.', '1.0625', '1.3', '1e2', '1/2 3',
+    '16 3/4"', '24x36', '10-1/2', '1 1/2 1/4', u'٣', '1_6', '9\t1/2',
+    '123456789012345678', '0', '-0', '-7/8', '8 16/32', None]
+
+
+def test_dimensions():
+    series = pandas.Series(DIMENSIONS, index=range(5, 5 + len(DIMENSIONS)))
+    returned = utils.dimensions(series)
+    assert returned.columns.tolist() == ['Inches', 'Fraction']
+    pandas.testing.assert_series_equal(returned['Inches'],
+                                       series.apply(utils.inches),
+                                       check_names=False)
+    pandas.testing.assert_series_equal(returned['Fraction'],
+                                       series.apply(utils.fraction),
+                                       check_names=False)
+
+
+@pytest.mark.parametrize('values', [
+    [16.75, 20.0, 0.1, -3.5, numpy.nan, numpy.inf],
+    [1, 2, 3],
+    [numpy.nan, numpy.nan],
+    ['20', '30']])
+def test_dimensions_dtypes(values):
+    series = pandas.Series(values)
+    returned = utils.dimensions(series)
+    pandas.testing.assert_series_equal(returned['Inches'],
+                                       series.apply(utils.inches),
+                                       check_names=False)
+    pandas.testing.assert_series_equal(returned['Fraction'],
+                                       series.apply(utils.fraction),
+                                       check_names=False,
+                                       check_dtype=False)
+
+
+def test_semijoin():
+    left = pandas.Series(['A', 'B', 'C', 'B'])
+    right = pandas.Series(['B', 'D', None, 'B', 'A'])
+    lcodes, rcodes, uniques = utils.factorize_keys(left, right)
+    assert list(uniques[lcodes]) == ['A', 'B', 'C', 'B']
+    assert rcodes[2] == -1
+    assert utils.semijoin(lcodes, rcodes, len(uniques)).tolist() == \
+        [True, True, False, True]
+    assert utils.semijoin(rcodes, lcodes, len(uniques)).tolist() == \
+        [True, False, False, True, True]
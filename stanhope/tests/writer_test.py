@@ -0,0 +1,87 @@
+import gzip
+import os
+
+import pandas
+import pytest
+from stanhope import writer
+
+FRAME = pandas.DataFrame({
+    'Name': ['Alice "Al"', 'Bob, Jr.', None, 'Dave\nSmith'] * 25,
+    'Amount': [1.5, 2.0, None, 4.25] * 25,
+    'Date': pandas.to_datetime(['2017-01-02 03:04:05', None,
+                                '2016-12-31', '2017-06-01'] * 25),
+}, columns=['Name', 'Amount', 'Date'])
+
+
+def expected(frame):
+    return frame.to_csv(None, index=False, date_format=writer.DATE_FORMAT)
+
+
+def read(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as stream:
+        return stream.read()
+
+
+def test_write(tmpdir):
+    paths = writer.CSVWriter(str(tmpdir)).write({'Orders': FRAME})
+    assert paths == [os.path.join(str(tmpdir), 'Orders.csv')]
+    assert read(paths[0]) == expected(FRAME)
+
+
+def test_write_rows(tmpdir):
+    csv = writer.CSVWriter(str(tmpdir), max_rows=30)
+    paths = csv.write({'Orders': FRAME})
+    assert [os.path.basename(x) for x in paths] == \
+        ['Orders-001.csv', 'Orders-002.csv', 'Orders-003.csv',
+         'Orders-004.csv']
+    returned = [read(x) for x in paths]
+    assert returned[-1] == expected(FRAME.iloc[90:])
+    assert returned[0] + ''.join(x.split('\n', 1)[1] for x in returned[1:]) \
+        == expected(FRAME)
+
+
+@pytest.mark.parametrize('max_rows', [None, 7])
+def test_write_bytes(tmpdir, max_rows):
+    csv = writer.CSVWriter(str(tmpdir), max_rows=max_rows, max_bytes=512)
+    paths = csv.write({'Orders': FRAME})
+    header = expected(FRAME.iloc[:0])
+    returned = [read(x) for x in paths]
+    assert len(returned) > 1
+    for text in returned:
+        assert text.startswith(header)
+        assert len(text.encode('utf-8')) <= 512
+    frames = [pandas.read_csv(x) for x in paths]
+    if max_rows:
+        assert max(len(x) for x in frames) <= max_rows
+    assert sum(len(x) for x in frames) == len(FRAME)
+    body = ''.join(x[len(header):] for x in returned)
+    assert header + body == expected(FRAME)
+
+
+def test_write_gzip(tmpdir):
+    csv = writer.CSVWriter(str(tmpdir), compression='gzip')
+    paths = csv.write({'Orders': FRAME, 'Empty': FRAME.iloc[:0]})
+    assert [os.path.basename(x) for x in paths] == \
+        ['Orders.csv.gz', 'Empty.csv.gz']
+    assert read(paths[0]) == expected(FRAME)
+    assert read(paths[1]) == expected(FRAME.iloc[:0])
+
+
+@pytest.mark.parametrize('max_rows,max_bytes', [
+    (None, None), (30, None), (None, 512), (7, 512)])
+def test_stream(tmpdir, max_rows, max_bytes):
+    csv = writer.CSVWriter(str(tmpdir.mkdir('whole')), max_rows, max_bytes)
+    paths = csv.write({'Orders': FRAME})
+    csv = writer.CSVWriter(str(tmpdir.mkdir('parts')), max_rows, max_bytes)
+    parts = [FRAME.iloc[x:x + 17] for x in range(0, len(FRAME), 17)]
+    streamed = csv.write({'Orders': iter(parts)})
+    assert [os.path.basename(x) for x in streamed] == \
+        [os.path.basename(x) for x in paths]
+    assert [read(x) for x in streamed] == [read(x) for x in paths]
+
+
+def test_stream_empty(tmpdir):
+    csv = writer.CSVWriter(str(tmpdir), max_rows=30)
+    paths = csv.stream('Empty', [FRAME.iloc[:0], FRAME.iloc[:0]])
+    assert [read(x) for x in paths] == [expected(FRAME.iloc[:0])]